@@ -1,14 +1,35 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, Response
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, Response, make_response, abort, g
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import DataError, IntegrityError
 from datetime import datetime, timezone, timedelta
 import time
-from flask_wtf.csrf import CSRFProtect
-import json
+from flask_wtf.csrf import CSRFProtect, generate_csrf
+from functools import wraps
 import os
 import re
-import urllib.request
-import urllib.error
+from github_profile import GitHubProfileCache
+from page_cache import PageCache, FileCache, CachedValue, LRUCache
+from http_cache import MemoizedFile, conditional, content_etag
+from sitemaps import build_sitemaps
+from assets import AssetManifest, DIST_DIR
+from compression import COMPRESSIBLE_EXTENSIONS, COMPRESSIBLE_TYPES, DYNAMIC_LEVELS, SUFFIXES, available_encodings, compress, negotiate
+from critical_css import CriticalStyles, CRITICAL_NAME
+from images import ImagePipeline, FORMATS as IMAGE_FORMATS, MODERN_FORMATS as MODERN_IMAGE_FORMATS, fallback_format
+from pagination import keyset_page, page_size
+import search_index
+from sqlite_tuning import install as install_sqlite_pragmas, pragmas_from_env, read_pragmas
+from db_config import database_url, engine_options
+from write_queue import WriteBehindQueue, QueueFull
+from passwords import PasswordHasher, HasherBusy
+from username_index import UsernameIndex, free_suffixes
+from rate_limit import RateLimiter, MemoryBackend, SQLiteBackend, parse_limit
+from werkzeug.middleware.proxy_fix import ProxyFix
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.security import safe_join
+from markupsafe import Markup
+import mimetypes
+import sqlite3
 
 # Indian Standard Time (IST) timezone
 IST = timezone(timedelta(hours=5, minutes=30))
@@ -17,32 +38,18 @@ def get_ist_time():
     """Get current time in IST"""
     return datetime.now(IST)
 
-def fetch_github_profile(username):
-    if not username:
-        return None
-    url = f"https://api.github.com/users/{username}"
-    try:
-        request_obj = urllib.request.Request(
-            url,
-            headers={"User-Agent": "portfolio-app"}
-        )
-        with urllib.request.urlopen(request_obj, timeout=5) as response:
-            data = json.load(response)
-        return {
-            "username": data.get("login") or username,
-            "name": data.get("name") or username,
-            "avatar_url": data.get("avatar_url"),
-            "html_url": data.get("html_url"),
-            "public_repos": data.get("public_repos"),
-            "followers": data.get("followers"),
-            "following": data.get("following"),
-        }
-    except (urllib.error.URLError, urllib.error.HTTPError, ValueError):
-        return None
-
 app = Flask(__name__)
+# Compiled templates are shared by all workers and survive restarts; must
+# be set before anything touches app.jinja_env
+jinja_cache_dir = os.environ.get('JINJA_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+os.makedirs(jinja_cache_dir, exist_ok=True)
+app.jinja_options = dict(app.jinja_options, bytecode_cache=FileSystemBytecodeCache(jinja_cache_dir))
+# Behind Render's proxy the client address is in X-Forwarded-For
+if int(os.environ.get('TRUSTED_PROXY_COUNT', '0')):
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.environ['TRUSTED_PROXY_COUNT']))
 csrf = CSRFProtect(app)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///portfolio.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 secret_key = os.environ.get('SECRET_KEY')
 if not secret_key:
@@ -54,7 +61,53 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = os.environ.get('SESSION_COOKIE_SECURE', '0') == '1'
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 60 * 60 * 24 * 30
+install_sqlite_pragmas(pragmas_from_env())
 db = SQLAlchemy(app)
+github_profiles = GitHubProfileCache(
+    ttl=int(os.environ.get('GITHUB_PROFILE_TTL', '900')),
+    error_ttl=int(os.environ.get('GITHUB_PROFILE_ERROR_TTL', '60')),
+)
+page_cache = PageCache(
+    version_path=os.path.join(app.instance_path, 'page_cache.version'),
+    ttl=int(os.environ.get('PAGE_CACHE_TTL', '300')),
+    max_entries=int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', '256')),
+    shared=FileCache(
+        os.environ['PAGE_CACHE_DIR'],
+        max_entries=int(os.environ.get('PAGE_CACHE_DIR_MAX_ENTRIES', '4096')),
+    ) if os.environ.get('PAGE_CACHE_DIR') else None,
+)
+password_hasher = PasswordHasher(
+    method=os.environ.get('PASSWORD_HASH_METHOD', 'scrypt'),
+    workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '2')),
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '8')),
+    timeout=float(os.environ.get('PASSWORD_HASH_TIMEOUT', '10')),
+    nice=int(os.environ.get('PASSWORD_HASH_NICE', '10')),
+    # Shared by all gunicorn workers, so MAX_PENDING bounds the whole host
+    slots_path=os.path.join(app.instance_path, 'password_hash.slots'),
+)
+if os.environ.get('RATE_LIMIT_BACKEND', 'sqlite') == 'memory':
+    rate_limiter = RateLimiter(MemoryBackend())
+else:
+    rate_limiter = RateLimiter(SQLiteBackend(
+        os.environ.get('RATE_LIMIT_DB') or os.path.join(app.instance_path, 'ratelimit.db')
+    ))
+asset_manifest = AssetManifest(app.static_folder, auto_reload=app.debug)
+# Not in debug mode: the stylesheet may be edited while the app runs
+critical_styles = CriticalStyles(
+    os.path.join(app.static_folder, DIST_DIR, CRITICAL_NAME),
+    None if app.debug else asset_manifest.version('css/output.css'),
+)
+image_pipeline = ImagePipeline(
+    app.static_folder,
+    os.environ.get('IMAGE_CACHE_DIR') or os.path.join(app.instance_path, 'image_cache'),
+)
+app.config['PAGE_CACHE_ENABLED'] = os.environ.get('PAGE_CACHE_ENABLED', '1') == '1'
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+app.config['SITE_URL'] = os.environ.get('SITE_URL', 'https://mrcurious.in')
+app.config['CRITICAL_CSS_ENABLED'] = os.environ.get('CRITICAL_CSS_ENABLED', '1') == '1'
+app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+app.config['PROJECT_DETAILS_TTL'] = int(os.environ.get('PROJECT_DETAILS_TTL', '300'))
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -63,6 +116,15 @@ class Project(db.Model):
     image_url = db.Column(db.String(200), nullable=True)
     github_link = db.Column(db.String(200), nullable=True)
     live_link = db.Column(db.String(200), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True, default=get_ist_time, onupdate=get_ist_time)
+    # Stable identifier used by sync_content.py
+    slug = db.Column(db.String(120), nullable=True)
+    # Copy for the project detail page; only needed there, so not loaded with the row
+    details = db.deferred(db.Column(db.JSON, nullable=True))
+
+    __table_args__ = (
+        db.Index('ix_project_slug', 'slug', unique=True),
+    )
 
     def __repr__(self):
         return f'<Project {self.title}>'
@@ -73,6 +135,12 @@ class BlogPost(db.Model):
     content = db.Column(db.Text, nullable=False)
     published_date = db.Column(db.String(20), nullable=False)
     image_url = db.Column(db.String(200), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True, default=get_ist_time, onupdate=get_ist_time)
+    slug = db.Column(db.String(120), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_blog_post_slug', 'slug', unique=True),
+    )
 
     def __repr__(self):
         return f'<BlogPost {self.title}>'
@@ -83,6 +151,11 @@ class Video(db.Model):
     description = db.Column(db.Text, nullable=False)
     video_url = db.Column(db.String(200), nullable=False)
     thumbnail_url = db.Column(db.String(200), nullable=True)
+    slug = db.Column(db.String(120), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_video_slug', 'slug', unique=True),
+    )
 
     def __repr__(self):
         return f'<Video {self.title}>'
@@ -105,11 +178,36 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, nullable=False, default=True)
     is_admin = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        db.Index('ix_user_created_at_id', 'created_at', 'id'),
+        # Emails are compared case-insensitively (signup, login)
+        db.Index('ix_user_email_lower', db.func.lower(email)),
+        # usernames_with_prefix_query's LIKE 'base%' (see migration 0009)
+        db.Index('ix_user_username_prefix', username.collate('NOCASE')).ddl_if(dialect='sqlite'),
+        db.Index('ix_user_username_prefix', username,
+                 postgresql_ops={'username': 'text_pattern_ops'}).ddl_if(dialect='postgresql'),
+    )
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'created_at': self.created_at.isoformat(),
+            'is_active': self.is_active,
+            'is_admin': self.is_admin,
+        }
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -123,6 +221,24 @@ class ContactMessage(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=get_ist_time)
     is_read = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        db.Index('ix_contact_message_created_at_id', 'created_at', 'id'),
+        # Partial index: unread count and unread listing only touch unread rows
+        db.Index('ix_contact_message_unread', created_at,
+                 sqlite_where=is_read == False, postgresql_where=is_read == False),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'subject': self.subject,
+            'message': self.message,
+            'created_at': self.created_at.isoformat(),
+            'is_read': self.is_read,
+        }
+
     def __repr__(self):
         return f'<ContactMessage from {self.name}>'
 
@@ -136,124 +252,628 @@ class Feedback(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=get_ist_time)
     is_approved = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        db.Index('ix_feedback_created_at_id', 'created_at', 'id'),
+        # connect() shows the latest approved feedback
+        db.Index('ix_feedback_approved_created_at', 'is_approved', 'created_at'),
+        db.Index('ix_feedback_pending', created_at,
+                 sqlite_where=is_approved == False, postgresql_where=is_approved == False),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'role': self.role,
+            'company': self.company,
+            'message': self.message,
+            'rating': self.rating,
+            'created_at': self.created_at.isoformat(),
+            'is_approved': self.is_approved,
+        }
+
     def __repr__(self):
         return f'<Feedback from {self.name}>'
 
 
-PROJECT_DETAILS_CONTENT = {
-    'end-to-end academic management system': {
-        'tagline': 'Curious Intelligence Platform: a role-based education management system for smarter academic and operational decisions.',
-        'overview': (
-            'Curious Intelligence Platform simplifies institutional operations through structured workflows, '
-            'real-time insights, and scalable architecture. The goal is not just digitization, but enabling '
-            'better academic and operational decisions.'
-        ),
-        'problem': (
-            'Educational institutions often rely on fragmented tools, manual processes, and disconnected '
-            'communication systems. This creates inefficient workflows, poor data visibility, delayed '
-            'decision-making, and weak centralized control.'
-        ),
-        'solution': (
-            'A unified, role-based, API-driven platform with clean architecture, scalable modules, and '
-            'mobile-responsive experiences across Admin, Teacher, and Student/Parent journeys.'
-        ),
-        'focus_areas': [
-            'Role-based dashboards (Admin, Teacher, Student/Parent)',
-            'Appointment and workflow management',
-            'Clean, scalable backend architecture',
-            'Mobile-responsive web experience',
-            'Future AI-assisted insights layer',
-        ],
-        'development_stage': [
-            'Authentication system completed (JWT-based secure login)',
-            'Role-based access control implemented',
-            'Initial Admin, Teacher, and Student dashboards built',
-            'Core management modules under development',
-            'Appointment workflow (basic version) in progress',
-            'Responsive web UI (mobile-friendly)',
-            'Public POC launch planned within the next 15 days',
-        ],
-        'modules': [
-            {'title': 'Admissions & Profiles', 'description': 'Student onboarding, profile lifecycle, and document records.'},
-            {'title': 'Attendance & Timetables', 'description': 'Department-wise schedules, attendance tracking, and reporting.'},
-            {'title': 'Assignments & Grading', 'description': 'Submission flow, evaluation, and result publishing.'},
-            {'title': 'Communication Hub', 'description': 'Department notices, targeted announcements, and event updates.'},
-            {'title': 'Admin Workflows', 'description': 'Approvals, role management, and institutional control dashboard.'},
-        ],
-        'architecture': [
-            'Backend owns all business logic; frontend focuses on presentation.',
-            'API-driven architecture with clean separation of concerns.',
-            'Maintainable and modular structure for long-term scale.',
-            'AI tools accelerate development, while engineering decisions stay human-owned.',
-        ],
-        'tech_stack': [
-            'Frontend: React.js + TypeScript + Tailwind CSS',
-            'Backend: Node.js + NestJS + REST APIs + JWT auth',
-            'Database: PostgreSQL (managed cloud instance)',
-            'Deployment: Vercel (frontend), Render (backend), cloud Postgres',
-        ],
-        'impact': [
-            'Faster communication across departments and cohorts.',
-            'Lower manual coordination overhead for faculty and admins.',
-            'Single source of truth for academic operations.',
-        ],
-        'roadmap': [
-            'Phase 1: Public POC (dashboards, appointment flow, deployment, early validation).',
-            'Phase 2: Stability and expansion (reliability, analytics, security, onboarding workflows).',
-            'Phase 3: Intelligence layer (AI recommendations, smart alerts, predictive insights).',
-        ],
-        'builders_intro': (
-            'I am actively looking for a technical partner (Backend / Full-Stack) for long-term ownership '
-            'to build this system from the ground up.'
-        ),
-        'builder_traits': [
-            'Thinks in systems, not shortcuts',
-            'Communicates clearly',
-            'Learns fast and adapts quickly',
-            'Understands scalable backend architecture',
-            'Uses AI tools intelligently',
-            'Wants to build long-term ownership',
-        ],
-    }
+# Defaults for project detail pages; each project's own copy is stored in
+# Project.details (synced from content/projects/) and overrides these.
+DEFAULT_PROJECT_DETAILS = {
+    'tagline': 'A focused build solving a real operational workflow.',
+    'problem': 'Teams face fragmented processes and low visibility across stakeholders.',
+    'solution': 'This product unifies workflows with one reliable system.',
+    'focus_areas': [],
+    'development_stage': [],
+    'modules': [],
+    'architecture': [],
+    'tech_stack': [],
+    'impact': [],
+    'roadmap': [],
+    'builders_intro': '',
+    'builder_traits': [],
 }
 
+# Built details per project version; updated_at changes on every edit
+project_details_cache = LRUCache(max_entries=128)
+
 
 def build_project_details(project):
-    detail = PROJECT_DETAILS_CONTENT.get(project.title.strip().lower(), {})
-    return {
-        'tagline': detail.get('tagline', 'A focused build solving a real operational workflow.'),
-        'overview': detail.get('overview', project.description),
-        'problem': detail.get('problem', 'Teams face fragmented processes and low visibility across stakeholders.'),
-        'solution': detail.get('solution', 'This product unifies workflows with one reliable system.'),
-        'focus_areas': detail.get('focus_areas', []),
-        'development_stage': detail.get('development_stage', []),
-        'modules': detail.get('modules', []),
-        'architecture': detail.get('architecture', []),
-        'tech_stack': detail.get('tech_stack', []),
-        'impact': detail.get('impact', []),
-        'roadmap': detail.get('roadmap', []),
-        'builders_intro': detail.get('builders_intro', ''),
-        'builder_traits': detail.get('builder_traits', []),
-    }
+    key = f'{project.id}:{project.updated_at}'
+    details = project_details_cache.get(key)
+    if details is None:
+        # Project.details is deferred, so it is only loaded on a cache miss
+        details = dict(DEFAULT_PROJECT_DETAILS, overview=project.description)
+        details.update(project.details or {})
+        project_details_cache.set(key, details, ttl=app.config['PROJECT_DETAILS_TTL'])
+    return details
+
+# Request-scoped identity
+def get_current_user():
+    """Return the logged-in User, loading it at most once per request."""
+    if '_current_user' not in g:
+        user_id = session.get('user_id')
+        g._current_user = db.session.get(User, user_id) if user_id else None
+    return g._current_user
+
+
+# Unread contact messages, shown in the admin header on every page. Kept as a
+# cached counter that contact message writes invalidate in every worker.
+unread_count_cache = CachedValue(
+    lambda: ContactMessage.query.filter_by(is_read=False).count(),
+    ttl=int(os.environ.get('UNREAD_COUNT_TTL', '30')),
+    version_path=os.path.join(app.instance_path, 'unread_count.version'),
+)
+
+
+# Admin dashboard statistics
+def dashboard_stats_query():
+    """All dashboard counters as scalar subqueries of a single SELECT.
+
+    One round trip, but each COUNT still scans its table or index, so the
+    cost grows with the row count; dashboard_stats keeps the result until a
+    counted value changes.
+    """
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+    return select(
+        count(User).label('total_users'),
+        count(Project).label('total_projects'),
+        count(BlogPost).label('total_posts'),
+        count(Video).label('total_videos'),
+        count(ContactMessage).label('total_messages'),
+        count(ContactMessage, ContactMessage.is_read == False).label('unread_messages'),
+        count(Feedback).label('total_feedback'),
+        count(Feedback, Feedback.is_approved == False).label('pending_feedback'),
+    )
+
+
+dashboard_stats = CachedValue(
+    lambda: dict(db.session.execute(dashboard_stats_query()).mappings().one()),
+    ttl=int(os.environ.get('DASHBOARD_STATS_TTL', '15')),
+    version_path=os.path.join(app.instance_path, 'dashboard_stats.version'),
+)
+# Models counted on the dashboard, and the flag columns some counts filter
+# on. Only inserts, deletes and changes to these flags invalidate the stats;
+# logins, profile edits and content edits leave them alone.
+DASHBOARD_STATS_MODELS = (User, Project, BlogPost, Video, ContactMessage, Feedback)
+DASHBOARD_STATS_FLAGS = {ContactMessage: 'is_read', Feedback: 'is_approved'}
+
+
+# Rate limiting
+# Per-IP and per-account token buckets for the public POST endpoints:
+# endpoint -> (per-IP limit, per-account limit). Each can be overridden with
+# RATE_LIMIT_<ENDPOINT> and RATE_LIMIT_<ENDPOINT>_ACCOUNT, e.g.
+# RATE_LIMIT_LOGIN_ACCOUNT=10/hour; "off" disables that limit.
+RATE_LIMIT_DEFAULTS = {
+    'submit_connect': ('5/minute', None),
+    'submit_feedback': ('3/minute', None),
+    'signup': ('10/hour', '3/hour'),
+    'login': ('20/minute', '5/minute'),
+    'check_username': ('60/minute', None),
+}
+RATE_LIMITS = {
+    endpoint: (
+        parse_limit(os.environ.get(f'RATE_LIMIT_{endpoint.upper()}', per_ip)),
+        parse_limit(os.environ.get(f'RATE_LIMIT_{endpoint.upper()}_ACCOUNT', per_account)),
+    )
+    for endpoint, (per_ip, per_account) in RATE_LIMIT_DEFAULTS.items()
+}
+# The account a request acts on, taken from the form so that attempts
+# against one account from many addresses share a bucket
+RATE_LIMIT_ACCOUNTS = {
+    'signup': lambda: request.form.get('email', '').strip().lower(),
+    'login': lambda: request.form.get('username', '').strip().lower(),
+}
+
+
+@app.before_request
+def throttle_public_posts():
+    """Refuse over-limit requests before the view touches the database."""
+    if not app.config['RATE_LIMIT_ENABLED'] or request.method != 'POST' \
+            or request.endpoint not in RATE_LIMITS:
+        return None
+    per_ip, per_account = RATE_LIMITS[request.endpoint]
+    checks = []
+    if per_ip:
+        checks.append((f'{request.endpoint}:ip:{request.remote_addr}', per_ip))
+    account = RATE_LIMIT_ACCOUNTS.get(request.endpoint, lambda: None)()
+    if per_account and account:
+        checks.append((f'{request.endpoint}:account:{account}', per_account))
+    for key, limit in checks:
+        allowed, retry_after = rate_limiter.hit(key, limit)
+        if not allowed:
+            response = jsonify({
+                'success': False,
+                'available': False,
+                'message': 'Too many requests. Please try again later.',
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+    return None
+
+
+# Contact and feedback submissions
+# Validated submissions are spooled to disk and committed in batches by a
+# background writer, so a burst of form posts doesn't make every worker wait
+# on the SQLite write lock. WRITE_QUEUE_ENABLED=0 writes them inline instead.
+SUBMISSION_MODELS = {
+    'contact': ContactMessage,
+    'feedback': Feedback,
+}
+SUBMISSIONS_BUSY_MESSAGE = 'We are receiving a lot of messages right now. Please try again in a minute.'
+
+
+def write_submissions(batch):
+    """Insert a batch of (kind, fields) submissions in one transaction."""
+    with app.app_context():
+        try:
+            for kind, fields in batch:
+                fields = dict(fields, created_at=datetime.fromisoformat(fields['created_at']))
+                db.session.add(SUBMISSION_MODELS[kind](**fields))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+submission_queue = WriteBehindQueue(
+    spool_dir=os.environ.get('WRITE_QUEUE_DIR') or os.path.join(app.instance_path, 'spool'),
+    handler=write_submissions,
+    max_size=int(os.environ.get('WRITE_QUEUE_MAX_SIZE', '1000')),
+    batch_size=int(os.environ.get('WRITE_QUEUE_BATCH_SIZE', '100')),
+    flush_interval=float(os.environ.get('WRITE_QUEUE_FLUSH_INTERVAL', '0.05')),
+    fsync=os.environ.get('WRITE_QUEUE_FSYNC', '1') == '1',
+    # Anything else (database locked, connection lost) is retried with backoff
+    permanent_errors=(IntegrityError, DataError),
+    max_retry_delay=float(os.environ.get('WRITE_QUEUE_MAX_RETRY_DELAY', '30')),
+)
+app.config['WRITE_QUEUE_ENABLED'] = os.environ.get('WRITE_QUEUE_ENABLED', '1') == '1'
+
+
+def save_submission(kind, fields):
+    """Store a submission; returns False when the queue is full."""
+    # Stamped now, not when the writer gets to it
+    fields = dict(fields, created_at=get_ist_time().isoformat())
+    if not app.config['WRITE_QUEUE_ENABLED']:
+        write_submissions([(kind, fields)])
+        return True
+    try:
+        submission_queue.submit(kind, fields)
+    except QueueFull:
+        return False
+    return True
+
+
+# Taken usernames, for /check-username. Reloaded by every worker after a
+# committed signup, rename or delete.
+username_index = UsernameIndex(
+    lambda: db.session.scalars(select(User.username)).all(),
+    version_path=os.path.join(app.instance_path, 'username_index.version'),
+    ttl=int(os.environ.get('USERNAME_INDEX_TTL', '300')),
+)
+
+
+class UsernameUnavailable(Exception):
+    """Raised when every free username picked for a new user was taken first."""
+
+
+def username_base(email):
+    """Username stem for an email address: the lowercased local part,
+    alphanumerics only, or "user" if that leaves nothing."""
+    return re.sub(r'[^a-zA-Z0-9]', '', email.split('@')[0]).lower() or 'user'
+
+
+def escape_like(value):
+    """``value`` as a literal in a LIKE pattern with ``escape='/'``."""
+    return re.sub(r'([/%_])', r'/\1', value)
+
+
+def usernames_with_prefix_query(prefix):
+    # A prefix LIKE rather than a range, which is only right under bytewise
+    # collation; the pattern is built here, not in SQL, so the planner can
+    # use ix_user_username_prefix (see migration 0009)
+    pattern = escape_like(prefix) + '%'
+    return select(User.username).where(User.username.like(pattern, escape='/'))
+
+
+def allocate_username(base):
+    """First free name among base, base1, base2, ... found with one indexed query."""
+    taken = db.session.scalars(usernames_with_prefix_query(base)).all()
+    return free_suffixes(base, taken)[0]
+
+
+def add_user_with_free_username(user, base, attempts=5):
+    """Insert ``user`` under the first free username for ``base`` and commit.
+
+    Another worker may take the same name between the lookup and the
+    insert; the unique index rejects one of them and it retries. Raises
+    ``UsernameUnavailable`` if that keeps happening.
+    """
+    for _ in range(attempts):
+        user.username = allocate_username(base)
+        db.session.add(user)
+        try:
+            db.session.commit()
+            return user.username
+        except IntegrityError as e:
+            db.session.rollback()
+            if 'username' not in str(e.orig):
+                raise
+    raise UsernameUnavailable()
+
+
+def _changes_dashboard_stats(obj, session_):
+    if not isinstance(obj, DASHBOARD_STATS_MODELS):
+        return False
+    if obj in session_.new or obj in session_.deleted:
+        return True
+    flag = DASHBOARD_STATS_FLAGS.get(type(obj))
+    return flag is not None and db.inspect(obj).attrs[flag].history.has_changes()
+
+
+def _changes_usernames(obj, session_):
+    if not isinstance(obj, User):
+        return False
+    if obj in session_.new or obj in session_.deleted:
+        return True
+    return db.inspect(obj).attrs.username.history.has_changes()
+
+
+# Public page cache
+# Models whose rows are rendered on the cached public pages. Any committed
+# write to them bumps the page cache version.
+PAGE_CACHE_MODELS = (Project, BlogPost, Video, Feedback)
+CSRF_PLACEHOLDER = '__csrf_token_placeholder__'
+
+
+def invalidate_public_pages():
+    page_cache.invalidate()
+
+
+def _affects_public_pages(obj):
+    if not isinstance(obj, PAGE_CACHE_MODELS):
+        return False
+    # New feedback stays hidden until approved, so spam doesn't flush the cache
+    if isinstance(obj, Feedback) and obj.id is None and not obj.is_approved:
+        return False
+    return True
+
+
+@event.listens_for(db.session, 'before_flush')
+def _track_content_writes(session_, flush_context, instances):
+    changed = list(session_.new) + list(session_.dirty) + list(session_.deleted)
+    if any(_affects_public_pages(obj) for obj in changed):
+        session_.info['public_pages_changed'] = True
+    if any(isinstance(obj, ContactMessage) for obj in changed):
+        session_.info['messages_changed'] = True
+    if any(_changes_usernames(obj, session_) for obj in changed):
+        session_.info['usernames_changed'] = True
+    if any(_changes_dashboard_stats(obj, session_) for obj in changed):
+        session_.info['stats_changed'] = True
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _track_bulk_content_writes(orm_execute_state):
+    mapper = orm_execute_state.bind_mapper
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete) \
+            or mapper is None:
+        return
+    if mapper.class_ in PAGE_CACHE_MODELS:
+        orm_execute_state.session.info['public_pages_changed'] = True
+    if mapper.class_ is ContactMessage:
+        orm_execute_state.session.info['messages_changed'] = True
+    if mapper.class_ is User:
+        orm_execute_state.session.info['usernames_changed'] = True
+    if mapper.class_ in (Project, BlogPost, Video):
+        orm_execute_state.session.info['search_changed'] = True
+    # A bulk UPDATE can't change a row count, only the flags
+    if mapper.class_ in DASHBOARD_STATS_MODELS and \
+            (not orm_execute_state.is_update or mapper.class_ in DASHBOARD_STATS_FLAGS):
+        orm_execute_state.session.info['stats_changed'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session_):
+    if session_.info.pop('public_pages_changed', False):
+        invalidate_public_pages()
+    if session_.info.pop('messages_changed', False):
+        unread_count_cache.invalidate()
+    if session_.info.pop('usernames_changed', False):
+        username_index.invalidate()
+    if session_.info.pop('stats_changed', False):
+        dashboard_stats.invalidate()
+    if session_.info.pop('search_changed', False):
+        rebuild_search_index(missing_ok=True)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _reset_after_rollback(session_):
+    session_.info.pop('public_pages_changed', None)
+    session_.info.pop('messages_changed', None)
+    session_.info.pop('usernames_changed', None)
+    session_.info.pop('stats_changed', None)
+    session_.info.pop('search_changed', None)
+
+
+# Full-text search
+# model -> (kind, title column, body column). The index is updated in the
+# same transaction as the rows; bulk statements rebuild it after commit.
+SEARCH_MODELS = {
+    Project: ('project', 'title', 'description'),
+    BlogPost: ('blog', 'title', 'content'),
+    Video: ('video', 'title', 'description'),
+}
+
+
+def search_documents(connection):
+    # Read on the given connection, not db.session: the rebuild runs from
+    # after_commit, where the session can no longer emit SQL
+    for model, (kind, title, body) in SEARCH_MODELS.items():
+        statement = select(model.id, getattr(model, title), getattr(model, body)).order_by(model.id)
+        for item_id, title_value, body_value in connection.execute(statement).all():
+            yield kind, item_id, title_value, body_value
+
+
+def rebuild_search_index(missing_ok=False):
+    """Re-create the search index from scratch; returns the documents indexed.
+
+    Raises search_index.IndexMissing on an unmigrated database unless
+    ``missing_ok``, when there is simply nothing to rebuild.
+    """
+    with db.engine.begin() as connection:
+        if not search_index.is_supported(connection):
+            return 0
+        if missing_ok and not search_index.exists(connection):
+            return 0
+        return search_index.rebuild(connection, search_documents(connection))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _update_search_index(session_, flush_context):
+    changed = [obj for obj in list(session_.new) + list(session_.dirty) + list(session_.deleted)
+               if type(obj) in SEARCH_MODELS]
+    if not changed:
+        return
+    connection = session_.connection()
+    if not search_index.is_supported(connection) or not search_index.exists(connection):
+        return
+    for obj in changed:
+        kind, title, body = SEARCH_MODELS[type(obj)]
+        if obj in session_.deleted:
+            search_index.delete(connection, kind, obj.id)
+        else:
+            search_index.upsert(connection, kind, obj.id, getattr(obj, title), getattr(obj, body))
+
+
+def run_search(query, kinds=None, limit=20):
+    connection = db.session.connection()
+    if search_index.is_supported(connection) and search_index.exists(connection):
+        return search_index.search(connection, query, kinds=kinds, limit=limit)
+    # Other databases, or a database not migrated to the search index yet:
+    # unranked substring match on the titles and bodies
+    results = []
+    for model, (kind, title, body) in SEARCH_MODELS.items():
+        if kinds and kind not in kinds:
+            continue
+        pattern = f'%{escape_like(query)}%'
+        rows = model.query.filter(
+            getattr(model, title).ilike(pattern, escape='/') | getattr(model, body).ilike(pattern, escape='/')
+        ).limit(limit)
+        for row in rows:
+            text_ = getattr(row, body) or ''
+            results.append({'kind': kind, 'id': row.id, 'title': getattr(row, title),
+                            'snippet': text_[:160], 'score': 0})
+    return results[:limit]
+
+
+def search_result_url(result):
+    if result['kind'] == 'project':
+        return url_for('project_detail', project_id=result['id'])
+    # Posts and videos are listed on the blog page
+    return url_for('blog')
+
+
+def _as_ist(value):
+    # updated_at is written in IST but comes back naive from SQLite
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=IST)
+    return value
+
+
+def latest_update(*models):
+    """Newest ``updated_at`` across ``models``, or None if there are no rows."""
+    dates = [db.session.query(db.func.max(model.updated_at)).scalar() for model in models]
+    return max((_as_ist(d) for d in dates if d), default=None)
+
+
+def _csrf_epoch():
+    # Pages embed a CSRF token, so a 304 must not let a browser keep a copy
+    # whose token is older than the token lifetime. Rotating the ETag every
+    # half lifetime bounds that age.
+    time_limit = app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    if not time_limit:
+        return 0
+    return int(time.time() // max(time_limit // 2, 1))
+
+
+def cached_page(last_modified=None):
+    """Serve anonymous GETs of the view from the page cache.
+
+    The per-session CSRF token is swapped for a placeholder before storing,
+    and the visitor's own token is substituted back in on every hit. Cached
+    pages carry an ETag derived from the stored body, so revalidating
+    visitors get a 304 without any rendering. ``last_modified``, called
+    with the view's arguments when the page is rendered, gives the newest
+    change to the rows the page shows; leave it out for pages that show
+    rows without a timestamp.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not app.config['PAGE_CACHE_ENABLED'] or request.method != 'GET' \
+                    or session.get('user_id') or session.get('_flashes'):
+                return view(*args, **kwargs)
+            # Pages contain absolute URLs (og:url, og:image) for the host asked
+            key = request.host_url + request.full_path.lstrip('/')
+            version = page_cache.version()
+            cached = page_cache.get(key, version)
+            if cached is not None:
+                body, body_etag, modified = cached
+                response = Response(mimetype='text/html')
+                response = conditional(response, request, f'{body_etag}-{_csrf_epoch()}', modified)
+                if response.status_code == 200:
+                    response.set_data(body.replace(CSRF_PLACEHOLDER, generate_csrf()))
+                response.headers['X-Page-Cache'] = 'HIT'
+                return response
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'text/html':
+                body = response.get_data(as_text=True).replace(generate_csrf(), CSRF_PLACEHOLDER)
+                body_etag = content_etag(body)
+                modified = last_modified(*args, **kwargs) if last_modified else None
+                page_cache.set(key, (body, body_etag, modified), version)
+                response = conditional(response, request, f'{body_etag}-{_csrf_epoch()}', modified)
+                response.headers['X-Page-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+robots_file = MemoizedFile(
+    os.path.join(app.root_path, 'robots.txt'),
+    default="User-agent: *\nAllow: /\nSitemap: https://mrcurious.in/sitemap.xml\n",
+)
+
+
+def _serve_memoized(memo, content_type):
+    content, etag, last_modified = memo.read()
+    response = Response(content, content_type=content_type)
+    return conditional(response, request, etag, last_modified)
+
+
+# Rendered sitemaps for the current page cache version only; any content
+# write bumps the version and the next request regenerates them.
+_sitemap_cache = {}
+
+
+def sitemap_entries():
+    last_project = db.session.query(db.func.max(Project.updated_at)).scalar()
+    last_post = db.session.query(db.func.max(BlogPost.updated_at)).scalar()
+    last_content = max((d for d in (last_project, last_post) if d), default=None)
+    entries = [
+        ('/', last_content, 'daily', 1.0),
+        ('/projects', last_project, 'weekly', 0.8),
+        ('/blog', last_post, 'weekly', 0.8),
+        ('/connect', None, 'monthly', 0.7),
+        ('/fun', None, 'monthly', 0.6),
+        ('/animations-demo', None, 'monthly', 0.5),
+    ]
+    yield from entries
+    project_rows = db.session.query(Project.id, Project.updated_at).order_by(Project.id).yield_per(1000)
+    for project_id, updated_at in project_rows:
+        yield f'/projects/{project_id}', updated_at, 'monthly', 0.7
+
+
+def get_sitemaps():
+    """``(documents, last_modified)`` for the current content version."""
+    version = page_cache.version()
+    cached = _sitemap_cache.get(version)
+    if cached is None:
+        documents = build_sitemaps(app.config['SITE_URL'], sitemap_entries())
+        cached = documents, _as_ist(documents[0].lastmod)
+        _sitemap_cache.clear()
+        _sitemap_cache[version] = cached
+    return cached
+
+
+def _serve_sitemap(number):
+    documents, last_modified = get_sitemaps()
+    document = documents.get(number)
+    if document is None:
+        abort(404)
+    etag = document.etag
+    if 'gzip' in request.accept_encodings:
+        response = Response(document.gzipped, content_type='application/xml; charset=utf-8')
+        response.headers['Content-Encoding'] = 'gzip'
+        etag += '-gz'
+    else:
+        response = Response(document.body, content_type='application/xml; charset=utf-8')
+    response.vary.add('Accept-Encoding')
+    return conditional(response, request, etag, last_modified)
+
 
 @app.route('/sitemap.xml')
 def sitemap():
-    sitemap_path = os.path.join(app.root_path, 'sitemap.xml')
-    with open(sitemap_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    return Response(content, content_type='application/xml; charset=utf-8')
+    return _serve_sitemap(0)
+
+@app.route('/sitemap-<int:number>.xml')
+def sitemap_part(number):
+    if number < 1:
+        abort(404)
+    return _serve_sitemap(number)
 
 @app.route('/robots.txt')
 def robots():
-    robots_path = os.path.join(app.root_path, 'robots.txt')
-    if os.path.exists(robots_path):
-        with open(robots_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    else:
-        content = "User-agent: *\nAllow: /\nSitemap: https://mrcurious.in/sitemap.xml\n"
-    return Response(content, content_type='text/plain; charset=utf-8')
+    return _serve_memoized(robots_file, 'text/plain; charset=utf-8')
+
+# Fingerprinted assets and image variants never change under the same URL
+ASSET_MAX_AGE = 60 * 60 * 24 * 365
+
+@app.route('/img/<path:filename>/<name>')
+def image_variant(filename, name):
+    """A resized/re-encoded copy of a static image (see images.py)."""
+    path = image_pipeline.variant(filename, name)
+    if path is None:
+        abort(404)
+    mimetype = IMAGE_FORMATS[name.rsplit('.', 1)[1]][1]
+    response = send_from_directory(image_pipeline.cache_dir, f'{filename}/{name}',
+                                   mimetype=mimetype, max_age=ASSET_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/healthz')
+def healthz():
+    """Liveness check plus the database settings actually in effect."""
+    try:
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('SELECT 1')
+            info = {'status': 'ok', 'database': connection.dialect.name}
+            if connection.dialect.name == 'sqlite':
+                info['sqlite'] = {
+                    'version': sqlite3.sqlite_version,
+                    'pragmas': read_pragmas(connection.connection.dbapi_connection),
+                }
+        info['write_queue'] = {
+            'enabled': app.config['WRITE_QUEUE_ENABLED'],
+            'pending': submission_queue.pending(),
+        }
+    except Exception:
+        return jsonify({'status': 'error'}), 503
+    return jsonify(info)
 
 @app.route('/')
+@cached_page(last_modified=lambda: latest_update(Project, BlogPost))
 def home():
     projects = Project.query.order_by(Project.id.desc()).all()
     blog_posts = BlogPost.query.order_by(BlogPost.id.desc()).all()
@@ -262,12 +882,15 @@ def home():
 
 
 @app.route('/projects')
+@cached_page(last_modified=lambda: latest_update(Project))
 def projects():
     projects = Project.query.order_by(Project.id.desc()).all()
     return render_template('project.html', projects=projects)
 
 
 @app.route('/projects/<int:project_id>')
+# The related projects are among the others, so any project's change counts
+@cached_page(last_modified=lambda project_id: latest_update(Project))
 def project_detail(project_id):
     project = Project.query.get_or_404(project_id)
     details = build_project_details(project)
@@ -286,11 +909,12 @@ def project_detail(project_id):
     )
 
 @app.route('/blog')
+@cached_page()
 def blog():
     blog_posts = BlogPost.query.order_by(BlogPost.id.desc()).all()
     videos = Video.query.order_by(Video.id.desc()).all()
     github_username = os.getenv('GITHUB_USERNAME', 'mrcuriousind')
-    github_profile = fetch_github_profile(github_username)
+    github_profile = github_profiles.get(github_username)
     linkedin_url = os.getenv('LINKEDIN_URL', 'https://www.linkedin.com/in/mrcuriousind')
     linkedin_label = os.getenv('LINKEDIN_LABEL', 'mrcuriousind')
     linkedin_connections = os.getenv('LINKEDIN_CONNECTIONS', '820')
@@ -306,11 +930,34 @@ def blog():
     )
 
 @app.route('/connect')
+@cached_page()
 def connect():
     # Get last 2 approved feedbacks
     feedbacks = Feedback.query.filter_by(is_approved=True).order_by(Feedback.created_at.desc()).limit(2).all()
     return render_template('connect.html', feedbacks=feedbacks)
 
+@app.route('/search')
+def search():
+    query = request.args.get('q', '').strip()[:200]
+    results = run_search(query) if query else []
+    for result in results:
+        result['url'] = search_result_url(result)
+    return render_template('search.html', query=query, results=results)
+
+@app.route('/api/search')
+def search_api():
+    """JSON search: ?q=...&kind=project|blog|video (repeatable)&limit=..."""
+    query = request.args.get('q', '').strip()[:200]
+    kinds = [kind for kind in request.args.getlist('kind') if kind in search_index.KINDS]
+    results = run_search(query, kinds=kinds, limit=page_size(request.args.get('limit'))) if query else []
+    return jsonify({
+        'query': query,
+        'results': [
+            dict(result, snippet=str(result['snippet']), url=search_result_url(result))
+            for result in results
+        ],
+    })
+
 @app.route('/fun')
 def fun():
     return render_template('fun.html')
@@ -342,17 +989,15 @@ def submit_connect():
         if len(message) > 2000:
             return jsonify({'success': False, 'message': 'Message is too long'})
         
-        # Create new contact message
-        new_message = ContactMessage(
-            name=name,
-            email=email,
-            subject=subject,
-            message=message
-        )
-        
-        db.session.add(new_message)
-        db.session.commit()
-        
+        queued = save_submission('contact', {
+            'name': name,
+            'email': email,
+            'subject': subject,
+            'message': message,
+        })
+        if not queued:
+            return jsonify({'success': False, 'message': SUBMISSIONS_BUSY_MESSAGE}), 503
+
         return jsonify({'success': True, 'message': 'Thank you for your message! I will get back to you soon.'})
     
     except Exception as e:
@@ -390,18 +1035,16 @@ def submit_feedback():
         if len(message) > 2000:
             return jsonify({'success': False, 'message': 'Message is too long'})
         
-        # Create new feedback
-        new_feedback = Feedback(
-            name=name,
-            role=role,
-            company=company,
-            message=message,
-            rating=rating
-        )
-        
-        db.session.add(new_feedback)
-        db.session.commit()
-        
+        queued = save_submission('feedback', {
+            'name': name,
+            'role': role,
+            'company': company,
+            'message': message,
+            'rating': rating,
+        })
+        if not queued:
+            return jsonify({'success': False, 'message': SUBMISSIONS_BUSY_MESSAGE}), 503
+
         return jsonify({'success': True, 'message': 'Thank you for your feedback! It will be reviewed and published soon.'})
     
     except Exception as e:
@@ -412,11 +1055,13 @@ def submit_feedback():
 def animations_demo():
     return render_template('animations_demo.html')
 
+PASSWORD_HASHER_BUSY_MESSAGE = 'The server is busy right now. Please try again in a moment.'
+
 @app.route('/signup', methods=['GET', 'POST'])
 def signup():
     if request.method == 'GET':
         return redirect(url_for('home'))
-    email = request.form.get('email', '').strip()
+    email = request.form.get('email', '').strip().lower()
     password = request.form.get('password', '')
     confirm_password = request.form.get('confirm_password', '')
 
@@ -438,27 +1083,24 @@ def signup():
     if confirm_password and password != confirm_password:
         return jsonify({'success': False, 'message': 'Passwords do not match'})
     
-    # Check if email already exists
-    existing_user = User.query.filter_by(email=email).first()
+    # Check if email already exists; older accounts may have kept their capitals
+    existing_user = User.query.filter(db.func.lower(User.email) == email).first()
     if existing_user:
         return jsonify({'success': False, 'message': 'Email already registered'})
     
-    # Generate username from email (part before @)
-    username_base = email.split('@')[0]
-    # Remove special characters and make it lowercase
-    username_base = re.sub(r'[^a-zA-Z0-9]', '', username_base).lower()
-    
-    # Check if username exists, if so add numbers
-    username = username_base
-    counter = 1
-    while User.query.filter_by(username=username).first():
-        username = f"{username_base}{counter}"
-        counter += 1
-    
-    new_user = User(username=username, email=email)
-    new_user.set_password(password)
-    db.session.add(new_user)
-    db.session.commit()
+    new_user = User(email=email)
+    try:
+        new_user.set_password(password)
+    except HasherBusy:
+        return jsonify({'success': False, 'message': PASSWORD_HASHER_BUSY_MESSAGE}), 503
+    try:
+        # Username from the email's local part, with a number added if taken
+        username = add_user_with_free_username(new_user, username_base(email))
+    except UsernameUnavailable:
+        return jsonify({'success': False, 'message': 'Could not pick a username right now. Please try again.'})
+    except IntegrityError:
+        # Lost a race with a concurrent signup for the same email
+        return jsonify({'success': False, 'message': 'Email already registered'})
     return jsonify({'success': True, 'username': username})
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -470,18 +1112,30 @@ def login():
     if not username_or_email or not password:
         return jsonify({'success': False, 'message': 'Username/email and password are required'})
     
-    # Try to find user by username or email (username is case-insensitive)
+    # Try to find user by username or email (both are case-insensitive).
+    # Emails are stored lowercased, but older signups kept them as typed.
     user = None
     if username_or_email:
         user = User.query.filter(
-            (User.username == username_or_email.lower()) | (User.email == username_or_email)
+            (User.username == username_or_email.lower())
+            | (db.func.lower(User.email) == username_or_email.lower())
         ).first()
     
-    if user and user.check_password(password):
+    try:
+        valid = user is not None and user.check_password(password)
+        if valid and user.password_needs_rehash():
+            # Upgrade hashes made with an older method or cost
+            user.set_password(password)
+            db.session.commit()
+    except HasherBusy:
+        return jsonify({'success': False, 'message': PASSWORD_HASHER_BUSY_MESSAGE}), 503
+
+    if valid:
         if not user.is_active:
             return jsonify({'success': False, 'message': 'Account is deactivated'})
         session['user_id'] = user.id
         session['user_initial'] = user.username[0].upper()
+        session['username'] = user.username
         session['is_admin'] = user.is_admin
         return jsonify({'success': True})
     return jsonify({'success': False, 'message': 'Invalid username/email or password'})
@@ -491,7 +1145,7 @@ def profile():
     user_id = session.get('user_id')
     if not user_id:
         return redirect(url_for('home'))
-    user = User.query.get(user_id)
+    user = get_current_user()
     return render_template('profile.html', user=user)
 
 @app.route('/edit_profile', methods=['GET', 'POST'])
@@ -499,18 +1153,24 @@ def edit_profile():
     user_id = session.get('user_id')
     if not user_id:
         return redirect(url_for('home'))
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if request.method == 'POST':
         # Check if username is being changed
         new_username = request.form.get('username', '').strip().lower()
         if new_username and new_username != user.username:
+            problem = username_problem(new_username)
+            if problem:
+                flash(problem)
+                return render_template('edit_profile.html', user=user)
             # Check if new username is already taken
             existing_user = User.query.filter_by(username=new_username).first()
             if existing_user:
                 flash('Username already taken. Please choose another one.')
                 return render_template('edit_profile.html', user=user)
             user.username = new_username
+            session['username'] = new_username
+            session['user_initial'] = new_username[0].upper()
         
         user.first_name = request.form.get('first_name', '')
         user.last_name = request.form.get('last_name', '')
@@ -527,61 +1187,192 @@ def edit_profile():
     
     return render_template('edit_profile.html', user=user)
 
-@app.route('/check-username', methods=['POST'])
-def check_username():
-    username = request.form.get('username', '').strip().lower()
-    user_id = session.get('user_id')
-    
+USERNAME_CANDIDATES_MAX = 20
+
+
+def username_problem(username):
+    """Why ``username`` can't be used, or None if it is well-formed."""
     if not username:
-        return jsonify({'available': False, 'message': 'Username cannot be empty'})
-    
+        return 'Username cannot be empty'
     # Check if username contains only valid characters
     if not re.match(r'^[a-z0-9_]+$', username):
-        return jsonify({'available': False, 'message': 'Username can only contain lowercase letters, numbers, and underscores'})
-    
+        return 'Username can only contain lowercase letters, numbers, and underscores'
     # Check if username is too short
     if len(username) < 3:
-        return jsonify({'available': False, 'message': 'Username must be at least 3 characters'})
-    
-    # Check if username already exists
-    existing_user = User.query.filter_by(username=username).first()
-    
+        return 'Username must be at least 3 characters'
+    if len(username) > 80:
+        return 'Username must be at most 80 characters'
+    return None
+
+
+def username_availability(username, current_username=None):
+    problem = username_problem(username)
+    if problem:
+        return {'available': False, 'message': problem}
     # If user is editing their own profile, allow their current username
-    if existing_user:
-        if user_id and existing_user.id == user_id:
-            return jsonify({'available': True, 'message': 'This is your current username'})
-        return jsonify({'available': False, 'message': 'Username already taken'})
-    
-    return jsonify({'available': True, 'message': 'Username is available'})
+    if username == current_username:
+        return {'available': True, 'message': 'This is your current username'}
+    if username in username_index:
+        return {'available': False, 'message': 'Username already taken'}
+    return {'available': True, 'message': 'Username is available'}
+
+
+@app.route('/check-username', methods=['POST'])
+def check_username():
+    """Check one ``username``, or several ``candidates`` in one request.
+
+    Answered from the in-memory username index; taken names come back with
+    a few free ``suggestions``.
+    """
+    current_username = session.get('username')
+    if current_username is None and session.get('user_id'):
+        user = get_current_user()
+        current_username = user.username if user else None
+        session['username'] = current_username
+
+    candidates = [name.strip().lower() for name in request.form.getlist('candidates') if name.strip()]
+    if candidates:
+        results = {}
+        for name in candidates[:USERNAME_CANDIDATES_MAX]:
+            results[name] = username_availability(name, current_username)
+        suggestions = []
+        taken = [name for name, result in results.items()
+                 if not result['available'] and not username_problem(name)]
+        if taken:
+            suggestions = username_index.suggest(taken[0])
+        return jsonify({'results': results, 'suggestions': suggestions})
+
+    username = request.form.get('username', '').strip().lower()
+    result = username_availability(username, current_username)
+    if not result['available'] and not username_problem(username):
+        result['suggestions'] = username_index.suggest(username)
+    return jsonify(result)
 
 @app.route('/logout')
 def logout():
     session.pop('user_id', None)
     session.pop('user_initial', None)
+    session.pop('username', None)
     session.pop('is_admin', None)
     flash('You have been logged out successfully')
     return redirect(url_for('home'))
 
 @app.context_processor
 def inject_user():
-    user_id = session.get('user_id')
-    unread_messages_count = 0
-    if user_id:
-        user = User.query.get(user_id)
-        if user and user.is_admin:
-            unread_messages_count = ContactMessage.query.filter_by(is_read=False).count()
-        return dict(current_user=user, unread_messages_count=unread_messages_count)
-    return dict(current_user=None, unread_messages_count=0)
+    user = get_current_user()
+    unread_messages_count = unread_count_cache.get() if user and user.is_admin else 0
+    return dict(current_user=user, unread_messages_count=unread_messages_count)
+
+@app.template_global()
+def asset_url(filename, _external=False):
+    """url_for('static', ...) pointing at the fingerprinted copy of ``filename``."""
+    fingerprinted = asset_manifest.get(filename)
+    if fingerprinted:
+        return url_for('static', filename=fingerprinted, _external=_external)
+    return url_for('static', filename=filename, v=asset_manifest.version(filename), _external=_external)
+
+@app.template_global()
+def critical_css():
+    """This page's above-the-fold CSS from build_critical_css.py, or None."""
+    if not app.config['CRITICAL_CSS_ENABLED']:
+        return None
+    css = critical_styles.get(request.endpoint)
+    return Markup(css.replace('</', '<\\/')) if css else None
+
+def serve_static(filename):
+    """Flask's static view, but sending a precompressed .br/.gz copy when the client accepts one."""
+    if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+        return app.send_static_file(filename)
+    offered = []
+    for encoding in SUFFIXES:
+        path = safe_join(app.static_folder, filename + SUFFIXES[encoding])
+        if path and os.path.isfile(path):
+            offered.append(encoding)
+    encoding = negotiate(request.accept_encodings, offered)
+    if encoding is None:
+        response = app.send_static_file(filename)
+    else:
+        response = send_from_directory(app.static_folder, filename + SUFFIXES[encoding],
+                                       mimetype=mimetypes.guess_type(filename)[0],
+                                       max_age=app.get_send_file_max_age(filename))
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
 
-@app.context_processor
-def inject_static_version():
-    def static_version(rel_path):
-        try:
-            abs_path = os.path.join(app.static_folder, rel_path)
-            return int(os.path.getmtime(abs_path))
-        except OSError:
-            return int(time.time())
-    return dict(static_version=static_version)
+app.view_functions['static'] = serve_static
+
+def _reflects_input_with_csrf_token():
+    # BREACH: when a page compresses the CSRF token together with text the
+    # requester chose (/search echoes q, admin lists echo the cursor), an
+    # attacker who can make a victim's browser send requests can recover
+    # the token byte by byte from the response sizes. Such pages go out
+    # uncompressed.
+    token_issued = g.get(app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token')) is not None
+    return token_issued and bool(request.query_string or request.form)
+
+@app.after_request
+def compress_response(response):
+    """Compress rendered pages and API responses above COMPRESS_MIN_SIZE."""
+    if (not app.config['COMPRESS_ENABLED'] or response.status_code != 200 or response.direct_passthrough
+            or response.is_streamed or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    if _reflects_input_with_csrf_token():
+        return response
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    encoding = negotiate(request.accept_encodings, available_encodings())
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding, DYNAMIC_LEVELS[encoding]))
+    response.headers['Content-Encoding'] = encoding
+    # The bytes differ per encoding; a weak ETag still matches the
+    # uncompressed validator when the browser revalidates
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+@app.after_request
+def cache_fingerprinted_assets(response):
+    if request.endpoint == 'static' and response.status_code == 200:
+        if asset_manifest.is_fingerprinted(request.view_args['filename'], request.args.get('v')):
+            response.cache_control.public = True
+            response.cache_control.max_age = ASSET_MAX_AGE
+            response.cache_control.immutable = True
+    return response
+
+@app.template_global()
+def responsive_image(src, alt='', sizes='100vw', class_=None, loading='lazy', fetchpriority=None):
+    """<picture> with AVIF/WebP/JPEG srcsets for an image under /static/.
+
+    Anything else (remote URLs, missing files) gets a plain <img>.
+    """
+    static_prefix = app.static_url_path + '/'
+    found = None
+    if src and src.startswith(static_prefix):
+        found = image_pipeline.variant_urls(src[len(static_prefix):].split('?', 1)[0])
+    attributes = Markup(' alt="{}" loading="{}" decoding="async"').format(alt, loading)
+    if class_:
+        attributes += Markup(' class="{}"').format(class_)
+    if fetchpriority:
+        attributes += Markup(' fetchpriority="{}"').format(fetchpriority)
+    if found is None:
+        return Markup('<img src="{}"{}>').format(src or '', attributes)
+
+    info, urls = found
+    srcsets = {fmt: ', '.join(f'{url} {width}w' for width, url in variants) for fmt, variants in urls.items()}
+    fallback = fallback_format(info)
+    parts = [Markup('<picture>')]
+    for fmt in MODERN_IMAGE_FORMATS:
+        parts.append(Markup('<source type="{}" srcset="{}" sizes="{}">').format(
+            IMAGE_FORMATS[fmt][1], srcsets[fmt], sizes))
+    parts.append(Markup('<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}"{}>').format(
+        urls[fallback][-1][1], srcsets[fallback], sizes, info.width, info.height, attributes))
+    parts.append(Markup('</picture>'))
+    return Markup('').join(parts)
 
 @app.after_request
 def add_security_headers(response):
@@ -591,6 +1382,14 @@ def add_security_headers(response):
     response.headers.setdefault('Permissions-Policy', 'camera=(), microphone=(), geolocation=()')
     return response
 
+def warm_up_templates():
+    """Load every template (from the bytecode cache when it is current) so
+    the first requests don't pay for compiling them; returns the count."""
+    names = app.jinja_env.list_templates(extensions=('html',))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
 @app.template_filter('ist_datetime')
 def ist_datetime_filter(dt):
     """Convert datetime to IST and format it"""
@@ -613,35 +1412,21 @@ def admin_dashboard():
         flash('Please login to access admin panel')
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         flash('Access denied. Admin privileges required.')
         return redirect(url_for('home'))
     
-    # Get statistics
-    total_users = User.query.count()
-    total_projects = Project.query.count()
-    total_posts = BlogPost.query.count()
-    total_videos = Video.query.count()
-    total_messages = ContactMessage.query.count()
-    unread_messages = ContactMessage.query.filter_by(is_read=False).count()
-    total_feedback = Feedback.query.count()
-    pending_feedback = Feedback.query.filter_by(is_approved=False).count()
+    # Get statistics (one query, cached for a few seconds)
+    stats = dashboard_stats.get()
     
     # Get recent users
     recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
     
     return render_template('admin/dashboard.html', 
                          user=user,
-                         total_users=total_users,
-                         total_projects=total_projects,
-                         total_posts=total_posts,
-                         total_videos=total_videos,
-                         total_messages=total_messages,
-                         unread_messages=unread_messages,
-                         total_feedback=total_feedback,
-                         pending_feedback=pending_feedback,
-                         recent_users=recent_users)
+                         recent_users=recent_users,
+                         **stats)
 
 @app.route('/admin/users')
 def admin_users():
@@ -649,12 +1434,15 @@ def admin_users():
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
-    users = User.query.order_by(User.created_at.desc()).all()
-    return render_template('admin/users.html', user=user, users=users)
+    cursor = request.args.get('cursor')
+    limit = page_size(request.args.get('limit'))
+    users, next_cursor = keyset_page(User.query, User, cursor, limit)
+    return render_template('admin/users.html', user=user, users=users,
+                           cursor=cursor, next_cursor=next_cursor, limit=limit)
 
 @app.route('/admin/messages')
 def admin_messages():
@@ -662,13 +1450,18 @@ def admin_messages():
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
-    messages = ContactMessage.query.order_by(ContactMessage.created_at.desc()).all()
-    unread_count = ContactMessage.query.filter_by(is_read=False).count()
-    return render_template('admin/messages.html', user=user, messages=messages, unread_count=unread_count)
+    cursor = request.args.get('cursor')
+    limit = page_size(request.args.get('limit'))
+    messages, next_cursor = keyset_page(ContactMessage.query, ContactMessage, cursor, limit)
+    unread_count = unread_count_cache.get()
+    total_count = dashboard_stats.get()['total_messages']
+    return render_template('admin/messages.html', user=user, messages=messages,
+                           unread_count=unread_count, total_count=total_count,
+                           cursor=cursor, next_cursor=next_cursor, limit=limit)
 
 @app.route('/admin/feedback')
 def admin_feedback():
@@ -676,13 +1469,40 @@ def admin_feedback():
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
-    feedbacks = Feedback.query.order_by(Feedback.created_at.desc()).all()
-    pending_count = Feedback.query.filter_by(is_approved=False).count()
-    return render_template('admin/feedback.html', user=user, feedbacks=feedbacks, pending_count=pending_count)
+    cursor = request.args.get('cursor')
+    limit = page_size(request.args.get('limit'))
+    feedbacks, next_cursor = keyset_page(Feedback.query, Feedback, cursor, limit)
+    stats = dashboard_stats.get()
+    return render_template('admin/feedback.html', user=user, feedbacks=feedbacks,
+                           pending_count=stats['pending_feedback'], total_count=stats['total_feedback'],
+                           cursor=cursor, next_cursor=next_cursor, limit=limit)
+
+# JSON variants of the admin lists: /admin/api/<collection>?cursor=...&limit=...
+ADMIN_LIST_MODELS = {
+    'users': User,
+    'messages': ContactMessage,
+    'feedback': Feedback,
+}
+
+@app.route('/admin/api/<collection>')
+def admin_list_api(collection):
+    user = get_current_user()
+    if not user or not user.is_admin:
+        return jsonify({'success': False, 'message': 'Admin privileges required'}), 403
+    model = ADMIN_LIST_MODELS.get(collection)
+    if model is None:
+        abort(404)
+    limit = page_size(request.args.get('limit'))
+    items, next_cursor = keyset_page(model.query, model, request.args.get('cursor'), limit)
+    return jsonify({
+        'success': True,
+        'items': [item.to_dict() for item in items],
+        'next_cursor': next_cursor,
+    })
 
 @app.route('/admin/feedback/<int:feedback_id>/approve', methods=['POST'])
 def approve_feedback(feedback_id):
@@ -690,7 +1510,7 @@ def approve_feedback(feedback_id):
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
@@ -708,7 +1528,7 @@ def hide_feedback(feedback_id):
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
@@ -726,7 +1546,7 @@ def delete_feedback(feedback_id):
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
@@ -744,7 +1564,7 @@ def mark_message_read(message_id):
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
@@ -762,7 +1582,7 @@ def delete_message(message_id):
     if not user_id:
         return redirect(url_for('home'))
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user or not user.is_admin:
         return redirect(url_for('home'))
     
@@ -780,7 +1600,7 @@ def make_admin(user_id):
     if not admin_id:
         return redirect(url_for('home'))
     
-    admin = User.query.get(admin_id)
+    admin = get_current_user()
     if not admin or not admin.is_admin:
         return redirect(url_for('home'))
     
@@ -798,7 +1618,7 @@ def delete_user(user_id):
     if not admin_id:
         return redirect(url_for('home'))
     
-    admin = User.query.get(admin_id)
+    admin = get_current_user()
     if not admin or not admin.is_admin:
         return redirect(url_for('home'))
     
@@ -822,7 +1642,7 @@ def toggle_user_status(user_id):
     if not admin_id:
         return redirect(url_for('home'))
     
-    admin = User.query.get(admin_id)
+    admin = get_current_user()
     if not admin or not admin.is_admin:
         return redirect(url_for('home'))
     
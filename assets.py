@@ -0,0 +1,92 @@
+"""
+Content-hashed static asset URLs.
+
+build_assets.py copies every file under static/ to
+``static/dist/<dir>/<name>.<hash>.<ext>`` and writes
+``static/dist/manifest.json`` mapping the original path to the copy. A
+fingerprinted URL changes exactly when the file's contents change, so it
+can be cached by browsers for a year without revalidating.
+
+Without a manifest (a fresh checkout, or a file added since the last
+build) the original file is served with ``?v=<hash>``, the hash being
+computed once per file and process. With ``auto_reload`` (debug mode)
+the manifest is ignored and the hash follows edits to the file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 10
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def fingerprinted_name(rel_path, digest):
+    stem, ext = os.path.splitext(rel_path)
+    return f'{DIST_DIR}/{stem}.{digest}{ext}'
+
+
+class AssetManifest:
+    """Original static path -> fingerprinted path, loaded once at startup."""
+
+    def __init__(self, static_dir, auto_reload=False):
+        self.static_dir = static_dir
+        self.auto_reload = auto_reload
+        self.path = os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)
+        # In debug mode files are edited in place, so the copies would go stale
+        self.entries = {} if auto_reload else self._load()
+        self._targets = set(self.entries.values())
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Skip entries whose copy is gone, e.g. a half-cleaned dist/
+        return {
+            source: target for source, target in entries.items()
+            if os.path.isfile(os.path.join(self.static_dir, target))
+        }
+
+    def get(self, rel_path):
+        """Fingerprinted path relative to static/, or None if not built."""
+        return self.entries.get(rel_path)
+
+    def version(self, rel_path):
+        """Content hash for a ``?v=`` parameter; None if the file doesn't exist."""
+        path = os.path.join(self.static_dir, rel_path)
+        try:
+            key = os.stat(path).st_mtime_ns if self.auto_reload else None
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._versions.get(rel_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        try:
+            version = file_hash(path)
+        except OSError:
+            # Not cached: the file may appear later
+            return None
+        with self._lock:
+            self._versions[rel_path] = (key, version)
+        return version
+
+    def is_fingerprinted(self, rel_path, version=None):
+        """Whether a request for ``rel_path`` (with ``?v=version``) can never change."""
+        if rel_path in self._targets:
+            return True
+        return version is not None and version == self.version(rel_path)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Before/after report for the inlined critical CSS.
+
+Renders the pages of build_critical_css.CRITICAL_PAGES through the test
+client with CRITICAL_CSS_ENABLED off and on, as a browser asking for
+Brotli/gzip would get them, and measures the server time, the compressed
+bytes of the HTML up to the first content and of the render-blocking
+stylesheet. From those it models first contentful paint on two network
+profiles (the ones Lighthouse throttles to):
+
+  before: the HTML start and css/output.css must both arrive; the
+          stylesheet request goes out one round trip after the HTML's
+  after:  only the HTML start, which now carries the critical CSS
+
+Transfers are modeled as TCP slow start (initial window 10 packets) over
+one connection opened with DNS + TCP + TLS round trips. Fonts, icons and
+analytics load the same way in both cases and are left out.
+
+The modelled FCP columns ignore parsing, layout and real network
+behaviour; only the sizes and the server time are measurements. With
+--browser, FCP is measured instead: the app is served on localhost behind
+a proxy that adds each profile's round-trip time (also when a connection
+opens) and caps its bandwidth, and headless Chromium (Playwright) loads
+every page cold --runs times and reports the browser's own
+first-contentful-paint entry. Third-party hosts (Google Fonts, Font
+Awesome) are made unresolvable so both variants wait on the same things.
+
+Run python build_assets.py and python build_critical_css.py first.
+
+Usage:
+  python bench_critical_css.py
+  python bench_critical_css.py --browser --runs 9
+      (needs: pip install playwright && playwright install chromium)
+"""
+
+import argparse
+import queue
+import re
+import socket
+import statistics
+import threading
+import time
+
+from app import app, critical_styles
+from build_critical_css import CRITICAL_PAGES
+from compression import available_encodings, compress, DYNAMIC_LEVELS, STATIC_LEVELS
+from critical_css import CONTENT_CLASS
+
+# name -> (round-trip time in seconds, bandwidth in bits per second)
+PROFILES = {
+    'slow 4G': (0.150, 1.6e6),
+    'desktop': (0.040, 10e6),
+}
+INITIAL_WINDOW = 10 * 1460
+SETUP_ROUND_TRIPS = 3
+REPEATS = 20
+# Chromium flags: only localhost resolves, so third-party requests fail at once
+BROWSER_ARGS = ['--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE 127.0.0.1', '--disable-gpu']
+FCP_SCRIPT = """new Promise(resolve => {
+    const entry = performance.getEntriesByName('first-contentful-paint')[0];
+    if (entry) return resolve(entry.startTime);
+    new PerformanceObserver(list => resolve(list.getEntries()[0].startTime))
+        .observe({type: 'paint', buffered: true});
+})"""
+
+
+def download(size, rtt, bandwidth):
+    """Seconds from sending a request until its last byte arrives."""
+    elapsed, remaining, window = rtt, size, INITIAL_WINDOW
+    while True:
+        sent = min(window, remaining)
+        elapsed += sent * 8 / bandwidth
+        remaining -= sent
+        if remaining <= 0:
+            return elapsed
+        # Wait for the window's acks unless the link was the bottleneck anyway
+        elapsed += max(0.0, rtt - window * 8 / bandwidth)
+        window *= 2
+
+
+def compressed_size(data, levels=DYNAMIC_LEVELS):
+    encoding = available_encodings()[0]
+    return len(compress(data, encoding, levels[encoding]))
+
+
+def measure(client, path):
+    """Median server time and the page's compressed first-content prefix size."""
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        response = client.get(path)
+        samples.append(time.perf_counter() - started)
+    html = response.get_data()
+    # The first element carrying the class, not the rule for it in the inlined <style>
+    first_content = re.search(rb'<[a-z][^>]*\sclass="[^"]*\b' + re.escape(CONTENT_CLASS.encode()) + rb'\b', html)
+    return statistics.median(samples), compressed_size(html[:first_content.start() if first_content else None])
+
+
+class ThrottledProxy:
+    """TCP proxy to ``upstream_port`` on localhost with a round-trip time and a bandwidth cap.
+
+    Each direction delays data by half the round trip; responses are also
+    paced at ``bandwidth`` bits per second per connection. A new
+    connection waits one round trip, as the TCP handshake would.
+    """
+
+    def __init__(self, upstream_port, rtt, bandwidth):
+        self.upstream_port = upstream_port
+        self.rtt = rtt
+        self.bandwidth = bandwidth
+        self._listener = socket.create_server(('127.0.0.1', 0))
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._connect, args=(client,), daemon=True).start()
+
+    def _connect(self, client):
+        time.sleep(self.rtt)
+        upstream = socket.create_connection(('127.0.0.1', self.upstream_port))
+        for source, target, bandwidth in ((client, upstream, None), (upstream, client, self.bandwidth)):
+            chunks = queue.Queue()
+            threading.Thread(target=self._read, args=(source, chunks), daemon=True).start()
+            threading.Thread(target=self._write, args=(target, chunks, bandwidth), daemon=True).start()
+
+    @staticmethod
+    def _read(source, chunks):
+        while True:
+            try:
+                data = source.recv(16384)
+            except OSError:
+                data = b''
+            chunks.put((time.monotonic(), data))
+            if not data:
+                return
+
+    def _write(self, target, chunks, bandwidth):
+        free_at = 0.0
+        while True:
+            arrived, data = chunks.get()
+            due = max(arrived + self.rtt / 2, free_at)
+            if bandwidth:
+                due += len(data) * 8 / bandwidth
+                free_at = due
+            time.sleep(max(0.0, due - time.monotonic()))
+            try:
+                if not data:
+                    target.shutdown(socket.SHUT_WR)
+                    return
+                target.sendall(data)
+            except OSError:
+                return
+
+    def close(self):
+        self._listener.close()
+
+
+def serve_app():
+    """Serve the app on a free localhost port from a background thread."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def playwright_loader():
+    """A load(url) -> FCP in ms function backed by headless Chromium, and its cleanup."""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("❌ --browser needs Playwright: pip install playwright && playwright install chromium")
+    playwright = sync_playwright().start()
+    browser = playwright.chromium.launch(args=BROWSER_ARGS)
+
+    def load(url):
+        # A new context per load: empty cache, new connections
+        context = browser.new_context()
+        try:
+            page = context.new_page()
+            page.goto(url, wait_until='load')
+            return page.evaluate(FCP_SCRIPT)
+        finally:
+            context.close()
+
+    def close():
+        browser.close()
+        playwright.stop()
+
+    return load, close
+
+
+def browser_report(load, runs):
+    """Median measured FCP per page and profile, with critical CSS off and on."""
+    app.config['PAGE_CACHE_ENABLED'] = False
+    server = serve_app()
+    print(f"{'page':<10}" + ''.join(f" {'FCP ' + name + ' before':>22} {'after':>7}" for name in PROFILES))
+    try:
+        for endpoint in CRITICAL_PAGES:
+            with app.test_request_context():
+                path = app.url_for(endpoint)
+            line = f"{endpoint:<10}"
+            for rtt, bandwidth in PROFILES.values():
+                proxy = ThrottledProxy(server.server_port, rtt, bandwidth)
+                url = f'http://127.0.0.1:{proxy.port}{path}'
+                medians = []
+                for enabled in (False, True):
+                    app.config['CRITICAL_CSS_ENABLED'] = enabled
+                    load(url)  # warm the server's caches, not the browser's
+                    medians.append(statistics.median(load(url) for _ in range(runs)))
+                proxy.close()
+                line += f" {medians[0]:>20.0f}ms {medians[1]:>5.0f}ms"
+            print(line, flush=True)
+    finally:
+        server.shutdown()
+    print(f"\nMedian of {runs} cold loads per cell, measured by the browser "
+          "(first-contentful-paint entry).")
+
+
+def main():
+    if not critical_styles.pages:
+        raise SystemExit("❌ No critical CSS for the current stylesheet; run python build_critical_css.py")
+    with open(f"{app.static_folder}/css/output.css", 'rb') as f:
+        # Precompressed by build_assets.py
+        stylesheet = compressed_size(f.read(), STATIC_LEVELS)
+    # Measure rendering rather than page cache hits of the other variant
+    app.config['PAGE_CACHE_ENABLED'] = False
+    client = app.test_client()
+
+    print(f"css/output.css: {stylesheet / 1024:.1f}KB compressed\n")
+    header = f"{'page':<10} {'server':>8} {'head before':>12} {'head after':>11}"
+    for name in PROFILES:
+        header += f" {'model FCP ' + name + ' before':>28} {'after':>7}"
+    print(header)
+    for endpoint in CRITICAL_PAGES:
+        with app.test_request_context():
+            path = app.url_for(endpoint)
+        app.config['CRITICAL_CSS_ENABLED'] = False
+        server, before = measure(client, path)
+        app.config['CRITICAL_CSS_ENABLED'] = True
+        _, after = measure(client, path)
+
+        line = f"{endpoint:<10} {server * 1000:>6.1f}ms {before / 1024:>10.1f}KB {after / 1024:>9.1f}KB"
+        for rtt, bandwidth in PROFILES.values():
+            start = SETUP_ROUND_TRIPS * rtt + server
+            fcp_before = start + max(download(before, rtt, bandwidth), rtt + download(stylesheet, rtt, bandwidth))
+            fcp_after = start + download(after, rtt, bandwidth)
+            line += f" {fcp_before * 1000:>26.0f}ms {fcp_after * 1000:>5.0f}ms"
+        print(line)
+    print("\nServer time and sizes are measured; FCP is modelled from them "
+          "(TCP slow start, no browser), not measured. Use --browser to measure it.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Critical CSS before/after report')
+    parser.add_argument('--browser', action='store_true', help='measure FCP in headless Chromium')
+    parser.add_argument('--runs', type=int, default=9, help='cold loads per page and variant with --browser')
+    args = parser.parse_args()
+
+    if args.browser:
+        if not critical_styles.pages:
+            raise SystemExit("❌ No critical CSS for the current stylesheet; run python build_critical_css.py")
+        load, close = playwright_loader()
+        try:
+            browser_report(load, args.runs)
+        finally:
+            close()
+    else:
+        main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark admin dashboard statistics.
+
+Compares the old approach (eight separate COUNT queries), the single
+aggregated query and the cached snapshot, which reads its version file on
+every hit as the app does, on a scratch SQLite database with N rows in
+each of user, contact_message and feedback.
+
+Usage: python bench_dashboard.py [sizes...]   (default: 1000 100000 1000000)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, select, text
+
+from app import app, db, User, Project, BlogPost, Video, ContactMessage, Feedback, dashboard_stats_query
+from page_cache import CachedValue
+
+REPEATS = 20
+BATCH = 50000
+
+
+def separate_queries(conn):
+    def count(model, *criteria):
+        return conn.execute(select(func.count()).select_from(model).where(*criteria)).scalar()
+    return {
+        'total_users': count(User),
+        'total_projects': count(Project),
+        'total_posts': count(BlogPost),
+        'total_videos': count(Video),
+        'total_messages': count(ContactMessage),
+        'unread_messages': count(ContactMessage, ContactMessage.is_read == False),
+        'total_feedback': count(Feedback),
+        'pending_feedback': count(Feedback, Feedback.is_approved == False),
+    }
+
+
+def single_query(conn):
+    return dict(conn.execute(dashboard_stats_query()).mappings().one())
+
+
+def fill(conn, start, stop):
+    now = '2026-01-01 00:00:00.000000'
+    for offset in range(start, stop, BATCH):
+        ids = range(offset, min(offset + BATCH, stop))
+        conn.execute(
+            text("INSERT INTO user (username, email, password_hash, created_at, is_active, is_admin) "
+                 "VALUES (:u, :e, 'x', :t, 1, 0)"),
+            [{'u': f'user{i}', 'e': f'user{i}@example.com', 't': now} for i in ids],
+        )
+        conn.execute(
+            text("INSERT INTO contact_message (name, email, subject, message, created_at, is_read) "
+                 "VALUES ('n', 'e@example.com', 's', 'm', :t, :r)"),
+            [{'t': now, 'r': i % 3 == 0} for i in ids],
+        )
+        conn.execute(
+            text("INSERT INTO feedback (name, role, message, rating, created_at, is_approved) "
+                 "VALUES ('n', 'r', 'm', 5, :t, :a)"),
+            [{'t': now, 'a': i % 2 == 0} for i in ids],
+        )
+    conn.commit()
+
+
+def timed(fn, repeats=REPEATS):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main(sizes):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        with app.app_context():
+            db.metadata.create_all(engine)
+        filled = 0
+        print(f"{'rows/table':>12} {'8 queries':>12} {'1 query':>12} {'cached':>12}")
+        with engine.connect() as conn:
+            for size in sizes:
+                fill(conn, filled, size)
+                filled = size
+                assert separate_queries(conn) == single_query(conn)
+                # With a version file, as in the app: each hit reads it
+                snapshot = CachedValue(lambda: single_query(conn), ttl=60, version_path=path + '.version')
+                snapshot.invalidate()
+                snapshot.get()
+                print(f"{size:>12,} {timed(lambda: separate_queries(conn)):>10.2f}ms "
+                      f"{timed(lambda: single_query(conn)):>10.2f}ms "
+                      f"{timed(snapshot.get, 1000):>10.4f}ms")
+    finally:
+        engine.dispose()
+        os.unlink(path)
+        if os.path.exists(path + '.version'):
+            os.unlink(path + '.version')
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000]
+    main(sorted(sizes))
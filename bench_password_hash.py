@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark login throughput per password hash setting.
+
+For each hash method, concurrent clients verify a password through
+passwords.PasswordHasher for a few seconds, as /login does, and the
+script reports logins per second and per-login latency. Run it with
+--workers 0 to measure hashing inline in the request worker.
+
+Usage: python bench_password_hash.py [--clients 8] [--workers 2] [--seconds 3] [methods...]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from passwords import PasswordHasher, hash_password
+
+DEFAULT_METHODS = [
+    'pbkdf2:sha256:600000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+]
+
+
+def run(method, clients, workers, seconds):
+    hasher = PasswordHasher(method=method, workers=workers, max_pending=clients, nice=0)
+    pwhash = hash_password('Benchmark1', method)
+    hasher.verify(pwhash, 'Benchmark1')  # start the pool
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client():
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            hasher.verify(pwhash, 'Benchmark1')
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.monotonic() - started
+    hasher.shutdown()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"{method:<24} {len(latencies) / duration:>10,.1f} "
+          f"{statistics.median(latencies) * 1000:>10.1f} {p95 * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Login throughput per password hash setting')
+    parser.add_argument('methods', nargs='*', default=DEFAULT_METHODS)
+    parser.add_argument('--clients', type=int, default=8, help='concurrent logins')
+    parser.add_argument('--workers', type=int, default=2, help='hashing processes (0 = inline)')
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, {args.workers or 'inline'} hashing worker(s)")
+    print(f"{'method':<24} {'logins/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for method in args.methods:
+        run(method, args.clients, args.workers, args.seconds)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-text search latency.
+
+Builds the FTS5 search index in a scratch SQLite database with N
+synthetic documents (titles of 5 words, bodies of 80 words drawn from a
+Zipf-distributed 20k-word vocabulary) and times search_index.search()
+for common, rare, multi-word and short-prefix queries. The target is under 10ms per
+query at 100k documents.
+
+Usage: python bench_search.py [N]   (default: 100000)
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+import search_index
+
+REPEATS = 50
+QUERIES = ['python', 'graph algorithm', 'dijk', 'ca', 'campus connectivity saas', 'zyzzyva']
+
+# Frequency rank of the words used in QUERIES; rank 100 appears in ~7% of
+# documents, rank 2000 in ~0.4%
+QUERY_WORD_RANKS = {
+    'python': 100, 'graph': 300, 'college': 400, 'algorithm': 500,
+    'campus': 800, 'saas': 1000, 'connectivity': 1500, 'dijkstra': 2000,
+}
+
+
+def vocabulary(size=20000):
+    rng = random.Random(1)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = []
+    while len(words) < size:
+        words.append(''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    for word, rank in QUERY_WORD_RANKS.items():
+        words[rank] = word
+    return words
+
+
+def documents(count):
+    rng = random.Random(2)
+    words = vocabulary()
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    kinds = list(search_index.KINDS)
+    for i in range(1, count + 1):
+        title = ' '.join(rng.choices(words, weights, k=5))
+        body = ' '.join(rng.choices(words, weights, k=80))
+        yield kinds[i % 3], i, title, body
+
+
+def main(count):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(search_index.create_sql()))
+            started = time.perf_counter()
+            search_index.rebuild(conn, documents(count))
+            print(f"Indexed {count:,} documents in {time.perf_counter() - started:.1f}s\n")
+
+        print(f"{'query':<28} {'hits':>6} {'p50':>10} {'p95':>10}")
+        with engine.connect() as conn:
+            for query in QUERIES:
+                samples = []
+                for _ in range(REPEATS):
+                    started = time.perf_counter()
+                    results = search_index.search(conn, query, limit=20)
+                    samples.append(time.perf_counter() - started)
+                samples.sort()
+                print(f"{query:<28} {len(results):>6} {statistics.median(samples) * 1000:>8.2f}ms "
+                      f"{samples[int(len(samples) * 0.95) - 1] * 1000:>8.2f}ms")
+    finally:
+        engine.dispose()
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
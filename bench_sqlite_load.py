@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Multi-process SQLite load test.
+
+Starts reader and writer processes against a scratch copy of the
+contact_message table, mimicking gunicorn workers serving /admin/messages
+while /submit-connect inserts rows. It runs once with SQLite's default
+settings and once with the PRAGMAs from sqlite_tuning.py, then reports
+throughput and "database is locked" errors.
+
+Usage: python bench_sqlite_load.py [--readers 4] [--writers 4] [--seconds 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from sqlite_tuning import apply_pragmas, pragmas_from_env
+
+SCHEMA = """
+CREATE TABLE contact_message (
+    id INTEGER NOT NULL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(120) NOT NULL,
+    subject VARCHAR(200) NOT NULL,
+    message TEXT NOT NULL,
+    created_at DATETIME NOT NULL,
+    is_read BOOLEAN NOT NULL
+);
+CREATE INDEX ix_contact_message_created_at_id ON contact_message (created_at, id);
+"""
+
+
+def connect(path, pragmas):
+    # Same as the app before tuning: Python's default 5 second lock timeout
+    conn = sqlite3.connect(path)
+    if pragmas:
+        apply_pragmas(conn, pragmas)
+    return conn
+
+
+def reader(path, pragmas, seconds, start, results):
+    conn = connect(path, pragmas)
+    start.wait()
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            conn.execute(
+                'SELECT * FROM contact_message ORDER BY created_at DESC, id DESC LIMIT 25'
+            ).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(('read', done, errors))
+
+
+def writer(path, pragmas, seconds, start, results):
+    conn = connect(path, pragmas)
+    start.wait()
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            conn.execute(
+                "INSERT INTO contact_message (name, email, subject, message, created_at, is_read) "
+                "VALUES ('n', 'n@example.com', 's', 'm', datetime('now'), 0)"
+            )
+            conn.commit()
+            done += 1
+        except sqlite3.OperationalError:
+            conn.rollback()
+            errors += 1
+    results.put(('write', done, errors))
+
+
+def run(label, pragmas, readers, writers, seconds):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            "INSERT INTO contact_message (name, email, subject, message, created_at, is_read) "
+            "VALUES ('n', 'n@example.com', 's', 'm', datetime('now'), 0)",
+            [()] * 10000,
+        )
+        conn.commit()
+        if pragmas:
+            apply_pragmas(conn, pragmas)
+        conn.close()
+
+        start = multiprocessing.Barrier(readers + writers)
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=reader, args=(path, pragmas, seconds, start, results))
+            for _ in range(readers)
+        ] + [
+            multiprocessing.Process(target=writer, args=(path, pragmas, seconds, start, results))
+            for _ in range(writers)
+        ]
+        for proc in procs:
+            proc.start()
+        totals = {'read': [0, 0], 'write': [0, 0]}
+        for _ in procs:
+            kind, done, errors = results.get(timeout=seconds + 60)
+            totals[kind][0] += done
+            totals[kind][1] += errors
+        for proc in procs:
+            proc.join()
+    finally:
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+    print(f"{label:<10} {totals['read'][0] / seconds:>12,.0f} {totals['read'][1]:>12,} "
+          f"{totals['write'][0] / seconds:>12,.0f} {totals['write'][1]:>12,}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SQLite multi-process load test')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'settings':<10} {'reads/s':>12} {'read errors':>12} {'writes/s':>12} {'write errors':>12}")
+    run('default', {}, args.readers, args.writers, args.seconds)
+    run('tuned', pragmas_from_env(), args.readers, args.writers, args.seconds)
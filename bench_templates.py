@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark template compile, load and render times.
+
+For every template: the time to compile it from source (what each worker
+paid on its first request before the bytecode cache), the time to load it
+from the bytecode cache instead, and, for the public pages, the median
+time render_template spends on it during a real request (page cache off).
+
+Usage: python bench_templates.py [--repeats 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from flask import before_render_template, template_rendered
+
+from app import app, warm_up_templates
+
+PAGES = ['/', '/projects', '/projects/1', '/blog', '/connect', '/search?q=python', '/fun', '/animations-demo']
+
+
+def median_ms(function, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def load_times(repeats):
+    """{template: (lines, compile ms, bytecode load ms)}"""
+    warm_up_templates()  # make sure the bytecode cache is filled
+    from_source = app.jinja_env.overlay(cache_size=0, bytecode_cache=None)
+    from_bytecode = app.jinja_env.overlay(cache_size=0)
+    results = {}
+    for name in app.jinja_env.list_templates(extensions=('html',)):
+        source, _, _ = app.jinja_env.loader.get_source(app.jinja_env, name)
+        results[name] = (
+            source.count('\n') + 1,
+            median_ms(lambda: from_source.get_template(name), repeats),
+            median_ms(lambda: from_bytecode.get_template(name), repeats),
+        )
+    return results
+
+
+def render_times(repeats):
+    """{template: (page, median render ms)} from requests to PAGES."""
+    app.config['PAGE_CACHE_ENABLED'] = False
+    samples = {}
+    started = {}
+
+    def before(sender, template, context, **extra):
+        started[template.name] = time.perf_counter()
+
+    def after(sender, template, context, **extra):
+        samples.setdefault(template.name, []).append(time.perf_counter() - started.pop(template.name))
+
+    client = app.test_client()
+    pages = {}
+    with before_render_template.connected_to(before, app), template_rendered.connected_to(after, app):
+        for page in PAGES:
+            seen = set(samples)
+            for _ in range(repeats):
+                client.get(page)
+            for name in set(samples) - seen:
+                pages[name] = page
+    return {name: (pages[name], statistics.median(values) * 1000) for name, values in samples.items()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark template compile/load/render times')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    loads = load_times(args.repeats)
+    renders = render_times(args.repeats)
+    print(f"{'template':<28} {'lines':>6} {'compile':>9} {'bytecode':>9} {'render':>9}  page")
+    for name, (lines, compile_ms, load_ms) in sorted(loads.items(), key=lambda item: -item[1][1]):
+        page, render_ms = renders.get(name, ('', None))
+        render = f"{render_ms:>7.2f}ms" if render_ms is not None else f"{'-':>9}"
+        print(f"{name:<28} {lines:>6} {compile_ms:>7.2f}ms {load_ms:>7.2f}ms {render}  {page}")
+    total_compile = sum(compile_ms for _, compile_ms, _ in loads.values())
+    total_load = sum(load_ms for _, _, load_ms in loads.values())
+    print(f"\nAll templates: {total_compile:.0f}ms to compile, {total_load:.1f}ms from the bytecode cache")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark username allocation for a heavily shared prefix.
+
+Fills a scratch SQLite database with N users named john, john1, ...
+john<N-1> (plus unrelated names) and times finding the next free name
+with the old one-query-per-candidate loop and with allocate_username's
+single prefix query.
+
+Usage: python bench_username_alloc.py [N]   (default: 10000)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, select, text
+
+from app import app, db, User, usernames_with_prefix_query
+from migrations import MigrationContext, m0009_username_prefix_index
+from username_index import free_suffixes
+
+REPEATS = 5
+
+
+def counting_loop(conn, base):
+    username = base
+    counter = 1
+    while conn.execute(select(User.id).where(User.username == username)).first():
+        username = f"{base}{counter}"
+        counter += 1
+    return username
+
+
+def single_query(conn, base):
+    return free_suffixes(base, conn.execute(usernames_with_prefix_query(base)).scalars().all())[0]
+
+
+def timed(fn):
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return result, statistics.median(samples) * 1000
+
+
+def main(size):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    queries = [0]
+    event.listen(engine, 'before_cursor_execute', lambda *args: queries.__setitem__(0, queries[0] + 1))
+    try:
+        with app.app_context():
+            db.metadata.create_all(engine)
+        with engine.connect() as conn:
+            m0009_username_prefix_index(MigrationContext(conn, db.metadata))
+            conn.commit()
+        with engine.connect() as conn:
+            names = ['john'] + [f'john{i}' for i in range(1, size)]
+            names += [f'johnny{i}' for i in range(size // 10)] + [f'jane{i}' for i in range(size)]
+            conn.execute(
+                text("INSERT INTO user (username, email, password_hash, created_at, is_active, is_admin) "
+                     "VALUES (:u, :e, 'x', '2026-01-01 00:00:00', 1, 0)"),
+                [{'u': name, 'e': f'{name}@example.com'} for name in names],
+            )
+            conn.commit()
+
+            print(f"{size:,} users named john, john1, ... john{size - 1}")
+            print(f"{'allocator':<14} {'result':>12} {'queries':>8} {'time':>12}")
+            for label, fn in (('counting loop', counting_loop), ('single query', single_query)):
+                queries[0] = 0
+                result, ms = timed(lambda: fn(conn, 'john'))
+                print(f"{label:<14} {result:>12} {queries[0] // REPEATS:>8,} {ms:>10.2f}ms")
+    finally:
+        engine.dispose()
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Fingerprint the static assets: copy every file under static/ to
+static/dist/ with a content hash in its name and write
+static/dist/manifest.json, which asset_url() reads at startup. Text
+assets (CSS, JS, SVG, ...) also get Brotli and gzip compressed siblings
+(.br/.gz) that the static route serves to clients accepting them. Copies
+left over from earlier builds are removed.
+
+Run it after building the CSS and before starting the app; without a
+manifest, asset URLs fall back to ?v=<hash> query strings.
+
+Usage:
+  python build_assets.py
+  python build_assets.py --static-dir static
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+from assets import DIST_DIR, MANIFEST_NAME, file_hash, fingerprinted_name
+from compression import COMPRESSIBLE_EXTENSIONS, SUFFIXES, available_encodings, write_precompressed
+from critical_css import CRITICAL_NAME
+
+# Sources the browser never loads
+SKIP = ('css/input.css',)
+
+
+def source_files(static_dir):
+    for root, dirs, files in os.walk(static_dir):
+        if root == static_dir:
+            dirs[:] = [d for d in dirs if d != DIST_DIR]
+        dirs.sort()
+        for name in sorted(files):
+            rel_path = os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
+            if rel_path not in SKIP and not name.startswith('.'):
+                yield rel_path
+
+
+def build_assets(static_dir):
+    """Copy, hash and compress every asset; returns ``(manifest, copied, compressed, removed)``."""
+    manifest = {}
+    copied = compressed = 0
+    wanted = set()
+    for rel_path in source_files(static_dir):
+        target = fingerprinted_name(rel_path, file_hash(os.path.join(static_dir, rel_path)))
+        manifest[rel_path] = target
+        target_path = os.path.join(static_dir, target)
+        wanted.add(os.path.normpath(target_path))
+        if not os.path.exists(target_path):
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            shutil.copy2(os.path.join(static_dir, rel_path), target_path)
+            copied += 1
+        if target_path.endswith(COMPRESSIBLE_EXTENSIONS):
+            siblings = [target_path + SUFFIXES[encoding] for encoding in available_encodings()]
+            if not all(os.path.exists(sibling) for sibling in siblings):
+                compressed += len(write_precompressed(target_path))
+            wanted.update(os.path.normpath(target_path + suffix) for suffix in SUFFIXES.values())
+
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    removed = 0
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if path not in wanted and name not in (MANIFEST_NAME, CRITICAL_NAME):
+                os.remove(path)
+                removed += 1
+
+    manifest_path = os.path.join(dist_dir, MANIFEST_NAME)
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest, copied, compressed, removed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fingerprint static assets')
+    parser.add_argument('--static-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    manifest, copied, compressed, removed = build_assets(args.static_dir)
+    print(f"✓ {len(manifest)} assets in manifest ({copied} copied, {compressed} compressed, "
+          f"{removed} stale removed) in {(time.monotonic() - started) * 1000:.0f}ms")
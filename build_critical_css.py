@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Extract the critical (above-the-fold) CSS of the main pages.
+
+Renders each page in CRITICAL_PAGES as an anonymous visitor, collects what
+is on screen before scrolling (see critical_css.py) and writes the
+matching subset of css/output.css to static/dist/critical.json. base.html
+inlines that subset and loads the full stylesheet without blocking
+rendering. The file records which output.css it was built from and is
+ignored once the stylesheet changes, so run this after every
+`npm run build:css`.
+
+Usage:
+  python build_critical_css.py
+  python build_critical_css.py --fold 200      # elements of the content column to cover
+"""
+
+import argparse
+import glob
+import json
+import os
+
+from app import app, asset_manifest
+from assets import DIST_DIR
+from compression import compress
+from critical_css import CRITICAL_NAME, FOLD_ELEMENTS, INLINE_BUDGET, extract, fold_selectors, script_classes
+
+STYLESHEET = 'css/output.css'
+CRITICAL_PAGES = ('home', 'blog', 'projects', 'connect')
+
+
+def runtime_classes():
+    """Classes added by the page scripts (templates and static/js)."""
+    classes = {'dark'}
+    paths = glob.glob(os.path.join(app.template_folder, '**', '*.html'), recursive=True)
+    paths += glob.glob(os.path.join(app.static_folder, 'js', '*.js'))
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            classes |= script_classes(f.read())
+    return classes
+
+
+def build_critical_css(fold=FOLD_ELEMENTS):
+    with open(os.path.join(app.static_folder, STYLESHEET), encoding='utf-8') as f:
+        css = f.read()
+    extra_classes = runtime_classes()
+    pages = {}
+    client = app.test_client()
+    for endpoint in CRITICAL_PAGES:
+        with app.test_request_context():
+            path = app.url_for(endpoint)
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+        used = fold_selectors(response.get_data(as_text=True), fold)
+        used.classes |= extra_classes
+        pages[endpoint] = extract(css, used)
+
+    output = os.path.join(app.static_folder, DIST_DIR, CRITICAL_NAME)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'source': asset_manifest.version(STYLESHEET), 'pages': pages}, f)
+    os.replace(output + '.tmp', output)
+    return css, pages
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract critical CSS for the main pages')
+    parser.add_argument('--fold', type=int, default=FOLD_ELEMENTS,
+                        help='elements of the content column counted as above the fold')
+    args = parser.parse_args()
+
+    css, pages = build_critical_css(args.fold)
+    full = len(compress(css.encode(), 'gzip', 9))
+    print(f"{STYLESHEET}: {len(css) / 1024:,.1f}KB ({full / 1024:,.1f}KB gzipped)")
+    over_budget = []
+    for endpoint, critical in pages.items():
+        size = len(compress(critical.encode(), 'gzip', 9))
+        print(f"  {endpoint:<10} {len(critical) / 1024:>6,.1f}KB inline ({size / 1024:,.1f}KB gzipped)")
+        if size > INLINE_BUDGET:
+            over_budget.append(endpoint)
+    print("\n✓ Wrote static/dist/critical.json")
+    if over_budget:
+        print(f"⚠ Over the {INLINE_BUDGET // 1024}KB gzipped budget: {', '.join(over_budget)} "
+              f"(try a smaller --fold)")
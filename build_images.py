@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Render the responsive variants (AVIF, WebP and JPEG/PNG in several widths)
+of every image under static/ into the image cache, so no visitor waits for
+one to be encoded. Variants that already exist are skipped; the /img/
+route renders anything missed on demand.
+
+Usage:
+  python build_images.py                    # every image under static/
+  python build_images.py Copilot.png        # just these (paths relative to static/)
+  python build_images.py --force            # re-render existing variants
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app import image_pipeline
+from images import ImagePipeline
+
+
+def build(source_dir, cache_dir, rel_path, force):
+    pipeline = ImagePipeline(source_dir, cache_dir)
+    return pipeline.build(rel_path, force=force)
+
+
+def variant_sizes(rel_path):
+    """Bytes of the source and of its largest variant in each format."""
+    found = image_pipeline.variant_urls(rel_path)
+    if found is None:
+        return None
+    info, urls = found
+    sizes = {}
+    for fmt, variants in urls.items():
+        width = variants[-1][0]
+        path = os.path.join(image_pipeline.cache_dir, rel_path, image_pipeline.variant_name(info, width, fmt))
+        sizes[fmt] = (width, os.path.getsize(path))
+    return os.path.getsize(image_pipeline.source_path(rel_path)), sizes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-render responsive image variants')
+    parser.add_argument('paths', nargs='*', help='images relative to static/ (default: all)')
+    parser.add_argument('--force', action='store_true', help='re-render variants that already exist')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='encoding processes')
+    args = parser.parse_args()
+
+    paths = args.paths or list(image_pipeline.sources())
+    started = time.monotonic()
+    rendered = skipped = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(build, image_pipeline.source_dir, image_pipeline.cache_dir, path, args.force)
+            for path in paths
+        ]
+        for path, future in zip(paths, futures):
+            try:
+                done, existing = future.result()
+            except OSError as e:
+                print(f"❌ {path}: {e}")
+                continue
+            rendered += done
+            skipped += existing
+            result = variant_sizes(path)
+            if result is None:
+                print(f"❌ {path}: not an image")
+                continue
+            original, sizes = result
+            formats = ', '.join(f"{fmt} {width}w {size / 1024:,.0f}KB" for fmt, (width, size) in sizes.items())
+            print(f"  {path}: {original / 1024:,.0f}KB -> {formats}")
+
+    print(f"\n✓ Rendered {rendered} variant(s), {skipped} already cached, in {time.monotonic() - started:.1f}s")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Query plan check (index advisor) and backend smoke run
+
+Migrates a database, then drives every route through the Flask test
+client: signup, login, the public pages, the admin pages, keyset pagination
+through the admin APIs, and search both before the search index migration
+(the LIKE fallback) and after it. Each response must have the expected
+status. On SQLite the SELECT statements of each request also go through
+EXPLAIN QUERY PLAN, and any full table scan that isn't covered by an index
+counts as a failure. Exits with status 1 on any failure.
+
+By default a scratch SQLite database is used. --database-url runs the same
+requests against another database, e.g. a throwaway PostgreSQL one; it
+must be empty, since tables are created and rows added.
+
+Usage:
+  python check_query_plans.py
+  python check_query_plans.py --database-url postgresql://localhost/portfolio_check
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+# Small content tables that the public pages intentionally list in full,
+# and the schema table (search checks whether its index exists).
+ALLOWED_FULL_SCANS = {'project', 'blog_post', 'video', 'sqlite_master'}
+
+
+@contextmanager
+def capture_queries(engine):
+    """Collect ``(statement, parameters)`` for every SELECT run on ``engine``."""
+    from sqlalchemy import event
+
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            queries.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def full_scans(connection, statement, parameters):
+    """Return the EXPLAIN QUERY PLAN lines of ``statement`` that scan a table."""
+    plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        if not detail.startswith('SCAN ') or 'USING' in detail or detail == 'SCAN CONSTANT ROW':
+            continue
+        # FTS5 lookups show up as a scan of the virtual table through its index
+        if 'VIRTUAL TABLE INDEX' in detail:
+            continue
+        table = detail.split()[1]
+        if table not in ALLOWED_FULL_SCANS:
+            problems.append(detail)
+    return problems
+
+
+def check(engine, requests_to_check):
+    """Run each request, check its status and (on SQLite) its query plans; returns the failures."""
+    failures = 0
+    explain = engine.dialect.name == 'sqlite'
+    with engine.connect() as connection:
+        for client, method, path, data, status, success in requests_to_check:
+            with capture_queries(engine) as queries:
+                response = client.open(path, method=method, data=data)
+            problems = []
+            if response.status_code != status:
+                problems.append(f'status {response.status_code}, expected {status}')
+            elif success is not None and (response.get_json(silent=True) or {}).get('success') != success:
+                problems.append(f'success is not {success}: {response.get_data(as_text=True)[:200]}')
+            for problem in problems:
+                failures += 1
+                print(f"❌ {method} {path}: {problem}")
+            for statement, parameters in queries if explain else ():
+                for problem in full_scans(connection, statement, parameters):
+                    failures += 1
+                    print(f"❌ {method} {path}: {problem}\n    {' '.join(statement.split())}")
+            if not problems:
+                print(f"✓ {method} {path} -> {response.status_code} ({len(queries)} queries)")
+    return failures
+
+
+def check_keyset_pages(admin, collection, expected):
+    """Walk /admin/api/<collection> one row per page; every row must come up once."""
+    seen, cursor = [], ''
+    for _ in range(expected + 1):
+        response = admin.get(f'/admin/api/{collection}?limit=1&cursor={cursor}')
+        if response.status_code != 200:
+            print(f"❌ GET /admin/api/{collection}: status {response.status_code}")
+            return 1
+        page = response.get_json()
+        seen += [item['id'] for item in page['items']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    if sorted(seen) != sorted(set(seen)) or len(seen) != expected:
+        print(f"❌ /admin/api/{collection} pages: ids {seen}, expected {expected} distinct rows")
+        return 1
+    print(f"✓ /admin/api/{collection} keyset pages -> {len(seen)} rows, one per page")
+    return 0
+
+
+def seed(db, models):
+    User, Project, BlogPost, Video, ContactMessage, Feedback = models
+    admin = User(username='planadmin', email='planadmin@example.com', is_admin=True)
+    admin.set_password('PlanCheck1')
+    db.session.add_all([
+        admin,
+        Project(title='Plan project', description='d'),
+        BlogPost(title='Plan post', content='c', published_date='January 1, 2026'),
+        Video(title='Plan video', description='d', video_url='https://example.com'),
+        ContactMessage(name='n', email='n@example.com', subject='s', message='m'),
+        Feedback(name='n', role='r', message='m', is_approved=True),
+    ])
+    db.session.commit()
+    return admin.id
+
+
+def main(database_url=None):
+    scratch = None
+    if database_url is None:
+        scratch = tempfile.mkdtemp()
+        database_url = f"sqlite:///{os.path.join(scratch, 'plans.db')}"
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['PAGE_CACHE_ENABLED'] = '0'
+    # Write submissions inline so they hit the database under test
+    os.environ['WRITE_QUEUE_ENABLED'] = '0'
+    os.environ['RATE_LIMIT_BACKEND'] = 'memory'
+    os.environ.setdefault('GITHUB_API_URL', 'http://127.0.0.1:9')
+
+    from app import app, db, User, Project, BlogPost, Video, ContactMessage, Feedback
+    from migrations import MIGRATIONS, upgrade
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        engine = db.engine
+        print(f"Database: {engine.dialect.name}")
+        # Everything but the search index first, to check the LIKE fallback
+        upgrade(engine, db.metadata, target=MIGRATIONS[-1][0] - 1, out=lambda line: None)
+        admin_id = seed(db, (User, Project, BlogPost, Video, ContactMessage, Feedback))
+
+    anonymous = app.test_client()
+    admin = app.test_client()
+    with admin.session_transaction() as sess:
+        sess['user_id'] = admin_id
+    searches = [
+        (anonymous, 'GET', '/search?q=plan', None, 200, None),
+        (anonymous, 'GET', '/api/search?q=plan&limit=5', None, 200, None),
+    ]
+
+    requests_to_check = [
+        (anonymous, 'GET', '/', None, 200, None),
+        (anonymous, 'GET', '/projects', None, 200, None),
+        (anonymous, 'GET', '/projects/1', None, 200, None),
+        (anonymous, 'GET', '/blog', None, 200, None),
+        (anonymous, 'GET', '/connect', None, 200, None),
+        (anonymous, 'GET', '/sitemap.xml', None, 200, None),
+        *searches,
+        (anonymous, 'POST', '/login', {'username': 'planadmin', 'password': 'wrong'}, 200, False),
+        (anonymous, 'POST', '/signup', {'email': 'new@example.com', 'password': 'PlanCheck1'}, 200, True),
+        (anonymous, 'POST', '/signup', {'email': 'new@example.com', 'password': 'PlanCheck1'}, 200, False),
+        (anonymous, 'POST', '/login', {'username': 'new@example.com', 'password': 'PlanCheck1'}, 200, True),
+        (anonymous, 'POST', '/check-username', {'username': 'someone'}, 200, None),
+        (anonymous, 'POST', '/submit-connect', {'name': 'n', 'email': 'n@example.com', 'subject': 's', 'message': 'm'}, 200, True),
+        (anonymous, 'POST', '/submit-feedback', {'name': 'n', 'role': 'r', 'message': 'm'}, 200, True),
+        (admin, 'GET', '/profile', None, 200, None),
+        (admin, 'GET', '/edit_profile', None, 200, None),
+        (admin, 'GET', '/admin', None, 200, None),
+        (admin, 'GET', '/admin/users', None, 200, None),
+        (admin, 'GET', '/admin/messages', None, 200, None),
+        (admin, 'GET', '/admin/feedback', None, 200, None),
+        (admin, 'GET', '/admin/api/users', None, 200, True),
+        (admin, 'GET', '/admin/api/messages', None, 200, True),
+        (admin, 'GET', '/admin/api/feedback', None, 200, True),
+    ]
+
+    failures = check(engine, requests_to_check)
+    # Seeded rows plus the signup and the two submissions above
+    for collection in ('users', 'messages', 'feedback'):
+        failures += check_keyset_pages(admin, collection, 2)
+    # And the full-text index, where the database has one
+    with app.app_context():
+        upgrade(engine, db.metadata, out=lambda line: None)
+    failures += check(engine, searches)
+
+    if scratch:
+        shutil.rmtree(scratch, ignore_errors=True)
+    if failures:
+        print(f"\n❌ {failures} problem(s) found")
+        sys.exit(1)
+    print("\n✓ No full table scans" if engine.dialect.name == 'sqlite' else "\n✓ All routes OK")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check query plans and smoke-test every route')
+    parser.add_argument('--database-url', help='empty database to run against instead of a scratch SQLite file')
+    args = parser.parse_args()
+    main(args.database_url)
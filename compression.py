@@ -0,0 +1,71 @@
+"""
+HTTP response compression.
+
+Static assets are compressed once at build time (build_assets.py writes
+``.br`` and ``.gz`` siblings next to each fingerprinted copy) and picked
+per request from Accept-Encoding. Dynamic responses such as rendered HTML
+are compressed on the fly with cheaper settings. Brotli is optional: if the
+``brotli`` package isn't installed only gzip is offered.
+"""
+
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml',
+    'application/manifest+json', 'image/svg+xml',
+}
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.html', '.json', '.map', '.svg', '.txt', '.xml')
+
+# encoding -> file suffix, in order of preference
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Build time: smallest output. On the fly: fast enough for every request.
+STATIC_LEVELS = {'br': 11, 'gzip': 9}
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+
+
+def available_encodings():
+    return tuple(encoding for encoding in SUFFIXES if encoding != 'br' or brotli is not None)
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def negotiate(accept_encodings, offered):
+    """The offered encoding the client prefers (q-values first, then our order), or None."""
+    if not offered:
+        return None
+    return accept_encodings.best_match(list(offered))
+
+
+def write_precompressed(path, min_size=256):
+    """Write ``path``'s .br/.gz siblings where they save space; returns the encodings written."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = []
+    for encoding in available_encodings():
+        sibling = path + SUFFIXES[encoding]
+        if len(data) < min_size:
+            compressed = None
+        else:
+            compressed = compress(data, encoding, STATIC_LEVELS[encoding])
+        if compressed is None or len(compressed) >= len(data):
+            # A stale sibling would otherwise keep being served
+            if os.path.exists(sibling):
+                os.remove(sibling)
+            continue
+        with open(sibling + '.tmp', 'wb') as f:
+            f.write(compressed)
+        os.replace(sibling + '.tmp', sibling)
+        written.append(encoding)
+    return written
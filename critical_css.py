@@ -0,0 +1,386 @@
+"""
+Critical (above-the-fold) CSS extraction.
+
+The page is rendered, and the tags, classes and ids of the elements a
+visitor sees first are collected: the header and the first
+``FOLD_ELEMENTS`` elements of the content column. Classes that scripts add
+at runtime (theme, menu, reveal animations) count as used too, since they
+can appear before the full stylesheet has loaded. Every rule of the
+stylesheet whose selector could match those elements is kept, along with
+the at-rules around it (@layer, @media, @supports), the @keyframes it
+animates with and the @font-face rules.
+
+Only what the first paint needs is kept. The descendants of hidden
+elements (the closed mobile menu) are skipped. Rules that only apply on
+interaction (:hover, :focus, :active and Tailwind's hover:/focus:
+variants) are dropped, since the full stylesheet has loaded by the time
+they matter. Custom properties, and their @property rules, that no kept
+rule reads with var() are removed too, which trims most of Tailwind's
+theme variables.
+
+Apart from that the selector test is deliberately loose: other
+pseudo-classes and attribute selectors are ignored, so a rule is only
+dropped when it names a tag, class or id the fold doesn't have.
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+
+CRITICAL_NAME = 'critical.json'
+FOLD_ELEMENTS = 40
+# Gzipped bytes of inline CSS per page beyond which build_critical_css.py
+# warns: with the rest of the head it should fit TCP's first 14KB window
+INLINE_BUDGET = 8 * 1024
+CONTENT_CLASS = 'layout-content-container'
+
+# Always present, whatever the page
+ALWAYS_USED_TAGS = {'html', 'body', 'head', ':root', ':host'}
+# Below-the-fold popups rely on it to stay closed until the full CSS loads
+ALWAYS_USED_CLASSES = {'hidden'}
+# Tailwind display utilities that show a "hidden" element at some breakpoint
+DISPLAY_CLASSES = {'block', 'inline', 'inline-block', 'flex', 'inline-flex', 'grid', 'inline-grid',
+                   'table', 'contents', 'flow-root'}
+INTERACTION_VARIANTS = {'hover', 'focus', 'focus-visible', 'focus-within', 'active', 'visited',
+                        'group-hover', 'group-focus', 'group-focus-within', 'group-active',
+                        'peer-hover', 'peer-focus', 'peer-focus-visible', 'peer-active'}
+GROUPING_AT_RULES = ('media', 'supports', 'layer', 'container')
+KEEP_AT_RULES = ('property', 'font-face', 'charset', 'import', 'namespace')
+
+_JS_CLASS_CALL = re.compile(r"classList\.(?:add|toggle|replace)\(([^)]*)\)")
+_QUOTED = re.compile(r"""'([^']*)'|"([^"]*)\"""")
+_ESCAPE = re.compile(r'\\([0-9a-fA-F]{1,6} ?|.)')
+_CLASS_OR_ID = re.compile(r'([.#])((?:\\[0-9a-fA-F]{1,6} ?|\\.|[\w-])+)')
+_ATTRIBUTE = re.compile(r'(?<!\\)\[[^\]]*\]')
+_PSEUDO = re.compile(r'::?[\w-]+')
+_TYPE = re.compile(r'(?<![\w-])([a-zA-Z][\w-]*)')
+_ANIMATION = re.compile(r'animation(?:-name)?\s*:\s*([^;}]+)')
+_INTERACTION_PSEUDO = re.compile(r'(?<!\\):(?:hover|focus|focus-visible|focus-within|active|visited)(?![\w-])')
+_CUSTOM_PROPERTY = re.compile(r'(?<=[{;])--([\w-]+):[^;{}]*(?:;|(?=}))')
+_PROPERTY_RULE = re.compile(r'@property --([\w-]+)\{[^}]*\}')
+_VAR = re.compile(r'var\(--([\w-]+)')
+_EMPTY_BLOCK = re.compile(r'[^{};]+\{\}')
+_STRING = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+_STRING_OR_COMMENT = re.compile(rf'({_STRING})|/\*.*?(?:\*/|$)', re.S)
+_MASKED_STRING = re.compile(r'\x00(\d+)\x00')
+
+
+class UsedSelectors:
+    """Tags, classes and ids that may be on screen before the full CSS loads."""
+
+    def __init__(self, tags=(), classes=(), ids=()):
+        self.tags = set(tags) | ALWAYS_USED_TAGS
+        self.classes = set(classes) | ALWAYS_USED_CLASSES
+        self.ids = set(ids)
+
+    def update(self, other):
+        self.tags |= other.tags
+        self.classes |= other.classes
+        self.ids |= other.ids
+
+
+class _FoldCollector(HTMLParser):
+    """Collects the header and the first elements of the content column."""
+
+    VOID = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+            'meta', 'source', 'track', 'wbr'}
+
+    def __init__(self, fold_elements):
+        super().__init__(convert_charrefs=True)
+        self.used = UsedSelectors()
+        self.fold_elements = fold_elements
+        self.content_seen = 0
+        self.content_depth = None
+        self.depth = 0
+        # Depth of the hidden element whose descendants are being skipped
+        self.hidden_depth = None
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self.hidden_depth is not None:
+            if tag not in self.VOID:
+                self.depth += 1
+            return
+        attributes = dict(attrs)
+        classes = (attributes.get('class') or '').split()
+        if self.content_depth is not None:
+            self.content_seen += 1
+            if self.content_seen > self.fold_elements:
+                self.done = True
+                return
+        self.used.tags.add(tag)
+        self.used.classes.update(classes)
+        if attributes.get('id'):
+            self.used.ids.add(attributes['id'])
+        if tag in self.VOID:
+            return
+        self.depth += 1
+        if self.content_depth is None and CONTENT_CLASS in classes:
+            self.content_depth = self.depth
+        if _is_hidden(attributes, classes):
+            self.hidden_depth = self.depth
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID and not self.done:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.done or tag in self.VOID:
+            return
+        if self.hidden_depth is not None:
+            if self.depth == self.hidden_depth:
+                self.hidden_depth = None
+            self.depth -= 1
+            return
+        if self.content_depth is not None and self.depth == self.content_depth:
+            # The content column ended before the fold budget ran out
+            self.done = True
+        self.depth -= 1
+
+
+def _is_hidden(attributes, classes):
+    """Hidden at every breakpoint: ``hidden`` without e.g. ``md:flex``."""
+    if 'hidden' in attributes:
+        return True
+    if 'hidden' not in classes:
+        return False
+    return not any(':' in name and name.rsplit(':', 1)[1] in DISPLAY_CLASSES for name in classes)
+
+
+def fold_selectors(html, fold_elements=FOLD_ELEMENTS):
+    collector = _FoldCollector(fold_elements)
+    collector.feed(html)
+    return collector.used
+
+
+def script_classes(text):
+    """Class names that scripts add with classList.add/toggle/replace."""
+    classes = set()
+    for call in _JS_CLASS_CALL.finditer(text):
+        for single, double in _QUOTED.findall(call.group(1)):
+            classes.update((single or double).split())
+    return classes
+
+
+def parse(css):
+    """Split CSS into top-level ``(prelude, block)`` pairs; block is None for statements."""
+    items = []
+    start = i = 0
+    length = len(css)
+    while i < length:
+        char = css[i]
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == ';':
+            statement = _strip_comments(css[start:i]).strip()
+            if statement:
+                items.append((statement, None))
+            start = i = i + 1
+            continue
+        if char == '{':
+            end = _matching_brace(css, i)
+            items.append((_strip_comments(css[start:i]).strip(), css[i + 1:end]))
+            start = i = end + 1
+            continue
+        i += 1
+    return items
+
+
+def _skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def _matching_brace(css, i):
+    depth = 0
+    while i < len(css):
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end == -1 else end + 2
+            continue
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def _strip_comments(text):
+    return _STRING_OR_COMMENT.sub(lambda m: m.group(1) or '', text)
+
+
+def _mask_strings(css):
+    """``css`` with every string swapped for a placeholder free of ``{};``, and the strings."""
+    strings = []
+
+    def stash(match):
+        strings.append(match.group(0))
+        return f'\x00{len(strings) - 1}\x00'
+    return re.sub(_STRING, stash, css), strings
+
+
+def _unmask_strings(css, strings):
+    return _MASKED_STRING.sub(lambda m: strings[int(m.group(1))], css)
+
+
+def _unescape(name):
+    def replace(match):
+        escaped = match.group(1)
+        if re.match(r'[0-9a-fA-F]', escaped):
+            return chr(int(escaped.strip(), 16))
+        return escaped
+    return _ESCAPE.sub(replace, name)
+
+
+def _split_selectors(prelude):
+    parts, depth, current = [], 0, ''
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _strip_functional_pseudos(selector):
+    """Remove :not(...), :where(...), :is(...) and friends with their arguments."""
+    result, i = '', 0
+    while i < len(selector):
+        match = re.match(r'::?[\w-]+\(', selector[i:])
+        if match and not selector[:i].endswith('\\'):
+            depth, j = 1, i + match.end()
+            while j < len(selector) and depth:
+                depth += {'(': 1, ')': -1}.get(selector[j], 0)
+                j += 1
+            i = j
+            continue
+        result += selector[i]
+        i += 1
+    return result
+
+
+def selector_matches(prelude, used):
+    """Whether any selector in the list could match an element in ``used``."""
+    for selector in _split_selectors(prelude):
+        if _INTERACTION_PSEUDO.search(selector):
+            continue
+        selector = _ATTRIBUTE.sub('', _strip_functional_pseudos(selector))
+        ok = True
+        for kind, name in _CLASS_OR_ID.findall(selector):
+            name = _unescape(name)
+            pool = used.classes if kind == '.' else used.ids
+            if name not in pool or (kind == '.' and INTERACTION_VARIANTS & set(name.split(':')[:-1])):
+                ok = False
+                break
+        if not ok:
+            continue
+        remainder = _PSEUDO.sub('', _CLASS_OR_ID.sub('', selector))
+        if all(tag.lower() in used.tags for tag in _TYPE.findall(remainder)):
+            return True
+    return False
+
+
+def minify(css):
+    css, strings = _mask_strings(_strip_comments(css))
+    css = re.sub(r'\s*([{};])\s*', r'\1', re.sub(r'\s+', ' ', css))
+    return _unmask_strings(css.replace(';}', '}').strip(), strings)
+
+
+def _at_rule_name(prelude):
+    match = re.match(r'@(-[a-z]+-)?([\w-]+)', prelude)
+    return match.group(2).lower() if match else ''
+
+
+def _filter(css, used, keyframes):
+    out = []
+    for prelude, block in parse(css):
+        if block is None:
+            if _at_rule_name(prelude) in ('layer',) + KEEP_AT_RULES:
+                out.append(prelude + ';')
+            continue
+        if prelude.startswith('@'):
+            name = _at_rule_name(prelude)
+            if name in GROUPING_AT_RULES:
+                inner = _filter(block, used, keyframes)
+                if inner:
+                    out.append(f'{prelude}{{{inner}}}')
+            elif name == 'keyframes':
+                keyframes.append((prelude.split()[-1], f'{prelude}{{{block}}}'))
+            elif name in KEEP_AT_RULES:
+                out.append(f'{prelude}{{{block}}}')
+        elif selector_matches(prelude, used):
+            out.append(f'{prelude}{{{block}}}')
+    return ''.join(out)
+
+
+def extract(css, used):
+    """The subset of ``css`` the elements in ``used`` need, minified."""
+    keyframes = []
+    kept = _filter(css, used, keyframes)
+    animations = set()
+    for value in _ANIMATION.findall(kept):
+        animations.update(re.findall(r'[\w-]+', value))
+    kept += ''.join(rule for name, rule in keyframes if name in animations)
+    # Pruning works on the text, so keep braces and var() inside strings out of its way
+    masked, strings = _mask_strings(minify(kept))
+    return _unmask_strings(_prune_custom_properties(masked), strings)
+
+
+def _prune_custom_properties(css):
+    """Drop custom property declarations and @property rules nothing reads."""
+    while True:
+        read = set(_VAR.findall(css))
+        pruned = _CUSTOM_PROPERTY.sub(lambda m: m.group(0) if m.group(1) in read else '', css)
+        pruned = _PROPERTY_RULE.sub(lambda m: m.group(0) if m.group(1) in read else '', pruned)
+        pruned = pruned.replace(';}', '}')
+        # Rules and at-rules left empty, innermost first
+        while True:
+            emptied = _EMPTY_BLOCK.sub('', pruned)
+            if emptied == pruned:
+                break
+            pruned = emptied
+        if pruned == css:
+            return css
+        css = pruned
+
+
+class CriticalStyles:
+    """Per-endpoint critical CSS written by build_critical_css.py, loaded once."""
+
+    def __init__(self, path, source_version):
+        self.pages = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Built from an older stylesheet: inlining it would show stale styles
+        if data.get('source') == source_version:
+            self.pages = data.get('pages', {})
+
+    def get(self, endpoint):
+        return self.pages.get(endpoint)
@@ -0,0 +1,38 @@
+"""
+Database URL and SQLAlchemy engine options from the environment.
+
+SQLite stays the default. Setting DATABASE_URL to a server database such as
+PostgreSQL lets several instances share one database, and its connection
+pool is then sized with the DB_POOL_* variables.
+"""
+
+import os
+
+DEFAULT_DATABASE_URL = 'sqlite:///portfolio.db'
+
+
+def database_url(environ=None):
+    environ = os.environ if environ is None else environ
+    url = environ.get('DATABASE_URL') or DEFAULT_DATABASE_URL
+    # Render and Heroku hand out postgres:// URLs, which SQLAlchemy rejects
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url, environ=None):
+    environ = os.environ if environ is None else environ
+    options = {
+        'pool_pre_ping': environ.get('DB_POOL_PRE_PING', '1') == '1',
+    }
+    if url.startswith('sqlite'):
+        # SQLite pools are per-file and in-memory databases use a
+        # single-connection pool, so the sizing options don't apply.
+        return options
+    options.update({
+        'pool_size': int(environ.get('DB_POOL_SIZE', '5')),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(environ.get('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', '1800')),
+    })
+    return options
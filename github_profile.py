@@ -0,0 +1,137 @@
+"""
+GitHub profile fetching with a TTL cache.
+
+The /blog page shows a small GitHub card. Fetching it inline used to block a
+worker on api.github.com for every page view, so profiles are now cached per
+process and refreshed in a background thread once they go stale. Failures are
+cached for a short time so an outage doesn't turn into a request stampede, and
+refreshes use ETag / If-None-Match so an unchanged profile costs a 304.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+
+
+def parse_profile(data, username):
+    return {
+        "username": data.get("login") or username,
+        "name": data.get("name") or username,
+        "avatar_url": data.get("avatar_url"),
+        "html_url": data.get("html_url"),
+        "public_repos": data.get("public_repos"),
+        "followers": data.get("followers"),
+        "following": data.get("following"),
+    }
+
+
+def fetch_github_profile(username, etag=None, api_url=None, timeout=5):
+    """Fetch a profile from the GitHub API.
+
+    Returns a ``(status, profile, etag)`` tuple. ``status`` is 200 when a fresh
+    profile was returned, 304 when ``etag`` is still current (``profile`` is
+    None) and None when the request failed.
+    """
+    if not username:
+        return None, None, None
+    url = f"{(api_url or GITHUB_API_URL).rstrip('/')}/users/{username}"
+    headers = {"User-Agent": "portfolio-app", "Accept": "application/vnd.github+json"}
+    if etag:
+        headers["If-None-Match"] = etag
+    try:
+        request_obj = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request_obj, timeout=timeout) as response:
+            data = json.load(response)
+            new_etag = response.headers.get("ETag")
+        return 200, parse_profile(data, username), new_etag
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return 304, None, etag
+        return None, None, None
+    except (urllib.error.URLError, ValueError, OSError):
+        return None, None, None
+
+
+class _Entry:
+    __slots__ = ('profile', 'etag', 'expires_at', 'refreshing', 'ready')
+
+    def __init__(self):
+        self.profile = None
+        self.etag = None
+        self.expires_at = 0.0
+        self.refreshing = False
+        self.ready = threading.Event()
+
+
+class GitHubProfileCache:
+    """Per-process stale-while-revalidate cache of GitHub profiles.
+
+    ``get()`` never waits on GitHub once a profile has been loaded: a stale
+    entry is returned immediately while a daemon thread refreshes it. Only the
+    very first lookup for a username waits, and at most ``cold_wait`` seconds.
+    """
+
+    def __init__(self, ttl=900, error_ttl=60, cold_wait=1.0, api_url=None, timeout=5):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.cold_wait = cold_wait
+        self.api_url = api_url
+        self.timeout = timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        if not username:
+            return None
+        key = username.lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            needs_refresh = not entry.refreshing and time.monotonic() >= entry.expires_at
+            if needs_refresh:
+                entry.refreshing = True
+        if needs_refresh:
+            threading.Thread(
+                target=self._refresh, args=(username, entry), daemon=True
+            ).start()
+        if not entry.ready.is_set():
+            entry.ready.wait(self.cold_wait)
+        return entry.profile
+
+    def refresh(self, username):
+        """Synchronously refresh ``username``; useful for warm-up and tests."""
+        key = username.lower()
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.refreshing = True
+        self._refresh(username, entry)
+        return entry.profile
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _refresh(self, username, entry):
+        try:
+            status, profile, etag = fetch_github_profile(
+                username, etag=entry.etag, api_url=self.api_url, timeout=self.timeout
+            )
+            now = time.monotonic()
+            if status == 200:
+                entry.profile = profile
+                entry.etag = etag
+                entry.expires_at = now + self.ttl
+            elif status == 304:
+                entry.expires_at = now + self.ttl
+            else:
+                # Keep serving whatever we had, but don't retry on every request.
+                entry.expires_at = now + self.error_ttl
+        finally:
+            entry.refreshing = False
+            entry.ready.set()
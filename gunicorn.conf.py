@@ -0,0 +1,16 @@
+"""
+Gunicorn settings, picked up automatically by `gunicorn app:app`.
+"""
+
+
+def post_worker_init(worker):
+    # Runs after the worker has imported the app and before it accepts
+    # connections: load the templates now instead of in the first requests
+    from app import app, submission_queue, warm_up_templates
+
+    count = warm_up_templates()
+    worker.log.info('Loaded %d templates', count)
+    # Adopt submissions spooled by workers that died before committing them
+    if app.config['WRITE_QUEUE_ENABLED']:
+        submission_queue.start()
+        worker.log.info('Write queue started with %d pending submissions', submission_queue.pending())
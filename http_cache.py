@@ -0,0 +1,56 @@
+"""
+Helpers for HTTP conditional requests (ETag / Last-Modified).
+"""
+
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+
+
+def content_etag(content):
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha1(content).hexdigest()[:20]
+
+
+def conditional(response, request, etag=None, last_modified=None):
+    """Attach validators to ``response`` and turn it into a 304 if they match."""
+    if etag:
+        response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers.setdefault('Cache-Control', 'no-cache')
+    return response.make_conditional(request)
+
+
+class MemoizedFile:
+    """In-memory copy of a small text file, reloaded when its mtime changes."""
+
+    def __init__(self, path, default=None):
+        self.path = path
+        self.default = default
+        self._mtime = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def read(self):
+        """Return ``(content, etag, last_modified)`` or None if unavailable."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._lock:
+            if self._value is not None and mtime == self._mtime:
+                return self._value
+            if mtime is None:
+                content, last_modified = self.default, None
+            else:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                last_modified = datetime.fromtimestamp(mtime / 1e9, tz=timezone.utc)
+            if content is None:
+                return None
+            self._mtime = mtime
+            self._value = (content, content_etag(content), last_modified)
+            return self._value
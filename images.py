@@ -0,0 +1,216 @@
+"""
+Responsive image variants for files under static/.
+
+Every source image is offered in a few widths and formats (AVIF and WebP,
+with JPEG as the fallback, or PNG when the image is transparent). Variants
+are downscaled only (never enlarged), have EXIF/XMP metadata removed and
+colour profiles converted to sRGB, and are stored once in a disk cache
+under ``<source path>/<width>-<hash>.<format>``. The hash is taken from
+the source file's contents, so a replaced image gets new URLs and every
+variant URL can be cached by browsers forever.
+
+build_images.py fills the cache ahead of a deploy; the /img/ route
+renders any variant still missing on its first request.
+"""
+
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from collections import namedtuple
+
+from PIL import Image, ImageCms, ImageOps
+
+from assets import DIST_DIR
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+WIDTHS = (320, 480, 640, 960, 1280, 1600)
+
+# format -> (Pillow format, mimetype, save options)
+FORMATS = {
+    'avif': ('AVIF', 'image/avif', {'quality': 55, 'speed': 6}),
+    'webp': ('WEBP', 'image/webp', {'quality': 78, 'method': 5}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 80, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', 'image/png', {'optimize': True}),
+}
+MODERN_FORMATS = ('avif', 'webp')
+
+VARIANT_NAME = re.compile(r'^(\d+)-([0-9a-f]{12})\.(avif|webp|jpg|png)$')
+
+SourceInfo = namedtuple('SourceInfo', 'hash width height transparent')
+
+
+def fallback_format(info):
+    return 'png' if info.transparent else 'jpg'
+
+
+def widths_for(info, widths=WIDTHS):
+    """Widths offered for a source: the configured ones below its own width, plus its width (capped)."""
+    chosen = [width for width in widths if width < info.width]
+    chosen.append(min(info.width, widths[-1]))
+    return sorted(set(chosen))
+
+
+def _has_transparency(image):
+    if image.mode in ('RGBA', 'LA', 'PA'):
+        return image.getchannel('A').getextrema()[0] < 255
+    return image.mode == 'P' and 'transparency' in image.info
+
+
+def _to_srgb(image):
+    icc_profile = image.info.get('icc_profile')
+    if not icc_profile:
+        return image
+    try:
+        source_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+        output_mode = 'RGBA' if 'A' in image.getbands() else 'RGB'
+        return ImageCms.profileToProfile(image, source_profile, ImageCms.createProfile('sRGB'),
+                                         outputMode=output_mode)
+    except (ImageCms.PyCMSError, OSError):
+        return image
+
+
+def render_variant(source_path, width, fmt):
+    """Encode ``source_path`` at ``width`` pixels wide as ``fmt``; returns the bytes."""
+    pillow_format, _, options = FORMATS[fmt]
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        transparent = _has_transparency(image)
+        image = _to_srgb(image)
+        image = image.convert('RGBA' if transparent and fmt != 'jpg' else 'RGB')
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        # Nothing from the source's metadata (EXIF, XMP, ICC, text chunks) is kept
+        image.info = {}
+        buffer = io.BytesIO()
+        image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+class ImagePipeline:
+    """Source lookup, URL building and the variant disk cache."""
+
+    def __init__(self, source_dir, cache_dir, url_prefix='/img', widths=WIDTHS):
+        self.source_dir = os.path.abspath(source_dir)
+        self.cache_dir = cache_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.widths = tuple(sorted(widths))
+        self._info = {}
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+
+    def source_path(self, rel_path):
+        """Absolute path of a source image, or None if it isn't one."""
+        if not rel_path.lower().endswith(SOURCE_EXTENSIONS):
+            return None
+        path = os.path.abspath(os.path.join(self.source_dir, rel_path))
+        if not path.startswith(self.source_dir + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def source_info(self, rel_path):
+        """Content hash and dimensions of a source, cached until the file changes."""
+        path = self.source_path(rel_path)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._info.get(rel_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()[:12]
+            with Image.open(path) as image:
+                image = ImageOps.exif_transpose(image)
+                info = SourceInfo(digest, image.width, image.height, _has_transparency(image))
+        except (OSError, Image.DecompressionBombError):
+            return None
+        with self._lock:
+            self._info[rel_path] = (key, info)
+        return info
+
+    def variant_name(self, info, width, fmt):
+        return f'{width}-{info.hash}.{fmt}'
+
+    def url(self, rel_path, info, width, fmt):
+        return f'{self.url_prefix}/{rel_path}/{self.variant_name(info, width, fmt)}'
+
+    def variant_urls(self, rel_path):
+        """``(info, {format: [(width, url), ...]})`` for a source image, or None."""
+        info = self.source_info(rel_path)
+        if info is None:
+            return None
+        widths = widths_for(info, self.widths)
+        urls = {
+            fmt: [(width, self.url(rel_path, info, width, fmt)) for width in widths]
+            for fmt in MODERN_FORMATS + (fallback_format(info),)
+        }
+        return info, urls
+
+    def variant(self, rel_path, name):
+        """Path of a cached variant, rendering it first if needed; None for unknown variants.
+
+        Old variants of a replaced source are still served while they are
+        in the cache, but only variants of the current file are rendered.
+        """
+        match = VARIANT_NAME.match(name)
+        if match is None or self.source_path(rel_path) is None:
+            return None
+        cached_path = os.path.join(self.cache_dir, rel_path, name)
+        if os.path.isfile(cached_path):
+            return cached_path
+        info = self.source_info(rel_path)
+        width, digest, fmt = int(match.group(1)), match.group(2), match.group(3)
+        if (info is None or digest != info.hash or width not in widths_for(info, self.widths)
+                or fmt not in MODERN_FORMATS + (fallback_format(info),)):
+            return None
+        # One render at a time per process: AVIF encoding is CPU heavy and
+        # a burst of first requests for the same page shouldn't stall it
+        with self._render_lock:
+            if not os.path.isfile(cached_path):
+                self._write(cached_path, render_variant(self.source_path(rel_path), width, fmt))
+        return cached_path
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def sources(self):
+        """Relative paths of every source image under the source directory."""
+        for root, dirs, files in os.walk(self.source_dir):
+            if root == self.source_dir:
+                # Fingerprinted copies made by build_assets.py
+                dirs[:] = [d for d in dirs if d != DIST_DIR]
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(SOURCE_EXTENSIONS):
+                    yield os.path.relpath(os.path.join(root, name), self.source_dir).replace(os.sep, '/')
+
+    def build(self, rel_path, force=False):
+        """Render every variant of one source; returns ``(rendered, skipped)`` counts."""
+        info = self.source_info(rel_path)
+        if info is None:
+            return 0, 0
+        rendered = skipped = 0
+        for fmt in MODERN_FORMATS + (fallback_format(info),):
+            for width in widths_for(info, self.widths):
+                path = os.path.join(self.cache_dir, rel_path, self.variant_name(info, width, fmt))
+                if os.path.isfile(path) and not force:
+                    skipped += 1
+                    continue
+                self._write(path, render_variant(self.source_path(rel_path), width, fmt))
+                rendered += 1
+        return rendered, skipped
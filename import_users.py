@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Bulk user import from CSV or JSONL files.
+
+Each row needs an email and either a password or a ready-made
+password_hash (a Werkzeug scrypt or pbkdf2 hash); name (or first_name/last_name), username and is_admin are
+optional. Usernames are derived from the email like signup does unless a
+free one is given.
+
+Rows are read in batches: passwords are hashed in parallel across a
+process pool, usernames are allocated in memory from one snapshot of the
+taken names, and each batch is inserted and committed in one transaction.
+After every commit the number of rows done is saved to a state file, so an
+interrupted import picks up where it stopped when run again. Rows that
+can't be imported are written to an errors CSV with their line number.
+
+Usage:
+  python import_users.py users.csv
+  python import_users.py users.jsonl --batch-size 2000 --workers 8
+  python import_users.py users.csv --hash-method scrypt:16384:8:1 --errors errors.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app import app, db, User, get_ist_time, password_hasher, username_base, username_problem
+from passwords import hash_password, is_password_hash
+from seed_users import parse_bool
+
+EMAIL_REGEX = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+
+
+class RowError(Exception):
+    pass
+
+
+def hash_row_password(password, method):
+    """hash_password for one row: (hash, None), or (None, error) if it fails."""
+    try:
+        return hash_password(password, method), None
+    except Exception as e:
+        return None, f'could not hash password: {e}'
+
+
+def read_rows(path):
+    """Yield (line number, row) from a .csv or .jsonl file; row is None if unreadable."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield number, row if isinstance(row, dict) else None
+
+
+class UsernameAllocator:
+    """Hands out free usernames from one snapshot of the taken ones."""
+
+    def __init__(self):
+        self.taken = set(db.session.scalars(select(User.username)))
+        self._next_suffix = {}
+
+    def allocate(self, base):
+        if base not in self.taken:
+            username = base
+        else:
+            suffix = self._next_suffix.get(base, 1)
+            while f'{base}{suffix}' in self.taken:
+                suffix += 1
+            self._next_suffix[base] = suffix + 1
+            username = f'{base}{suffix}'
+        self.taken.add(username)
+        return username
+
+    def claim(self, username):
+        if username in self.taken:
+            return False
+        self.taken.add(username)
+        return True
+
+
+def text_value(row, key):
+    """``row[key]`` as a string, '' if missing; JSONL values may be any type."""
+    value = row.get(key)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise RowError(f'{key} must be a string')
+    return value
+
+
+def parse_row(row, seen_emails):
+    """Validate one input row; returns the User column values minus the hash."""
+    if row is None:
+        raise RowError('unreadable row')
+    email = text_value(row, 'email').strip().lower()
+    if not email or not EMAIL_REGEX.match(email):
+        raise RowError('missing or invalid email')
+    if len(email) > 120:
+        raise RowError('email is too long')
+    if email in seen_emails:
+        raise RowError('email already registered')
+    password_hash = text_value(row, 'password_hash')
+    if not text_value(row, 'password') and not password_hash:
+        raise RowError('missing password')
+    if password_hash and not (is_password_hash(password_hash) and len(password_hash) <= 200):
+        raise RowError('password_hash is not a Werkzeug scrypt or pbkdf2 hash')
+
+    first_name = text_value(row, 'first_name').strip()
+    last_name = text_value(row, 'last_name').strip()
+    name = text_value(row, 'name').strip()
+    if name and not (first_name or last_name):
+        first_name, _, last_name = name.partition(' ')
+        last_name = last_name.strip()
+    username = text_value(row, 'username').strip().lower()
+    if username and username_problem(username):
+        raise RowError(username_problem(username))
+
+    seen_emails.add(email)
+    return {
+        'email': email,
+        'username': username,
+        'first_name': first_name[:50] or None,
+        'last_name': last_name[:50] or None,
+        'is_admin': parse_bool(row.get('is_admin'), default=False),
+        'is_active': True,
+    }
+
+
+class Importer:
+    def __init__(self, pool, workers, hash_method, batch_size, errors_writer):
+        self.pool = pool
+        self.workers = workers
+        self.hash_method = hash_method
+        self.batch_size = batch_size
+        self.errors_writer = errors_writer
+        self.usernames = UsernameAllocator()
+        # Older signups kept their emails as typed; file emails are lowercased
+        self.emails = set(db.session.scalars(select(func.lower(User.email))))
+        self.imported = self.failed = 0
+
+    def error(self, path, line, row, message):
+        self.failed += 1
+        email = (row or {}).get('email', '') if isinstance(row, dict) else ''
+        self.errors_writer.writerow([path, line, email, message])
+
+    def prepare(self, path, batch):
+        """Validate, hash and name a batch; returns rows ready to insert."""
+        valid = []
+        for line, row in batch:
+            try:
+                valid.append((line, row, parse_row(row, self.emails)))
+            except RowError as e:
+                self.error(path, line, row, str(e))
+
+        to_hash = [(i, row['password']) for i, (_, row, _) in enumerate(valid) if not row.get('password_hash')]
+        results = self.pool.map(
+            hash_row_password,
+            [password for _, password in to_hash],
+            [self.hash_method] * len(to_hash),
+            chunksize=max(1, len(to_hash) // (4 * self.workers)),
+        ) if to_hash else []
+        hashed = dict(zip((i for i, _ in to_hash), results))
+
+        ready = []
+        for i, (line, row, values) in enumerate(valid):
+            if i in hashed:
+                values['password_hash'], error = hashed[i]
+                if error:
+                    self.emails.discard(values['email'])
+                    self.error(path, line, row, error)
+                    continue
+            else:
+                values['password_hash'] = row['password_hash']
+            if not (values['username'] and self.usernames.claim(values['username'])):
+                values['username'] = self.usernames.allocate(username_base(values['email']))
+            values['created_at'] = get_ist_time()
+            ready.append((line, row, values))
+        return ready
+
+    def insert(self, path, ready):
+        try:
+            db.session.execute(insert(User), [values for _, _, values in ready])
+            db.session.commit()
+            self.imported += len(ready)
+            return
+        except IntegrityError:
+            db.session.rollback()
+        # Someone signed up with one of these names or emails meanwhile:
+        # insert one by one so only the conflicting rows fail.
+        self.usernames = UsernameAllocator()
+        for line, row, values in ready:
+            if not row.get('username'):
+                values['username'] = self.usernames.allocate(username_base(values['email']))
+            try:
+                db.session.execute(insert(User), [values])
+                db.session.commit()
+                self.imported += 1
+            except IntegrityError as e:
+                db.session.rollback()
+                self.error(path, line, row, str(e.orig))
+
+    def run(self, path, state):
+        done = resumed = state.get(path, 0)
+        rows = islice(read_rows(path), done, None)
+        started = time.monotonic()
+        if done:
+            print(f"↻ {path}: resuming after {done:,} rows")
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.insert(path, self.prepare(path, batch))
+            done += len(batch)
+            state[path] = done
+            yield done
+            rate = (done - resumed) / max(time.monotonic() - started, 1e-9)
+            print(f"  {path}: {done:,} rows, {self.imported:,} imported, "
+                  f"{self.failed:,} errors ({rate:,.0f} rows/s)", flush=True)
+
+
+def load_state(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path, state):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import users from CSV or JSONL files')
+    parser.add_argument('files', nargs='+', help='.csv or .jsonl files')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='password hashing processes')
+    parser.add_argument('--hash-method', default=password_hasher.method,
+                        help='Werkzeug hash method (weaker hashes are upgraded at login)')
+    parser.add_argument('--state', default='import_users.state.json', help='progress file for resuming')
+    parser.add_argument('--errors', default='import_users.errors.csv', help='where to write rejected rows')
+    args = parser.parse_args()
+
+    state = load_state(args.state)
+    with app.app_context(), ProcessPoolExecutor(max_workers=args.workers) as pool, \
+            open(args.errors, 'a', newline='', encoding='utf-8') as errors_file:
+        errors_writer = csv.writer(errors_file)
+        if errors_file.tell() == 0:
+            errors_writer.writerow(['file', 'line', 'email', 'error'])
+        importer = Importer(pool, args.workers, args.hash_method, args.batch_size, errors_writer)
+        started = time.monotonic()
+        for path in args.files:
+            for _ in importer.run(path, state):
+                save_state(args.state, state)
+                errors_file.flush()
+
+    elapsed = time.monotonic() - started
+    print(f"\n✓ Imported {importer.imported:,} users in {elapsed:.1f}s")
+    if importer.failed:
+        print(f"❌ {importer.failed:,} rows rejected, see {args.errors}")
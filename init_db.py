@@ -5,11 +5,12 @@ Run this to create the database and tables
 """
 
 from app import app, db
+from migrations import upgrade
 
 def init_database():
     with app.app_context():
-        # Create all tables
-        db.create_all()
+        # Create all tables and record the schema version
+        upgrade(db.engine, db.metadata, out=lambda message: None)
         print("✓ Database initialized successfully!")
         print("✓ All tables created")
         print("\nYou can now:")
@@ -1,37 +1,57 @@
 #!/usr/bin/env python3
 """
 Database Migration Script
-Adds is_admin column to existing users
+Applies pending schema migrations (see migrations.py) to the configured
+database (DATABASE_URL, default instance/portfolio.db).
+
+Usage:
+  python migrate_db.py              # apply all pending migrations
+  python migrate_db.py --dry-run    # print the SQL without changing anything
+  python migrate_db.py --status     # show the current schema version
+  python migrate_db.py --target 3   # migrate up to a specific version
 """
 
-import sqlite3
-
-def migrate_database():
-    conn = sqlite3.connect('instance/portfolio.db')
-    cursor = conn.cursor()
-    
-    try:
-        # Check if column exists
-        cursor.execute("PRAGMA table_info(user)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'is_admin' not in columns:
-            print("Adding is_admin column...")
-            cursor.execute("ALTER TABLE user ADD COLUMN is_admin BOOLEAN DEFAULT 0")
-            conn.commit()
-            print("✓ is_admin column added successfully!")
-        else:
-            print("✓ is_admin column already exists")
-        
-        conn.close()
-        print("\n✓ Database migration completed!")
-        print("\nNext steps:")
-        print("1. Make a user admin: python make_admin.py <username>")
-        print("2. Restart the server: python app.py")
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        conn.close()
+import argparse
+
+from app import app, db
+from migrations import MIGRATIONS, current_version, pending_migrations, upgrade
+
+
+def migrate_database(target=None, dry_run=False):
+    with app.app_context():
+        try:
+            applied = upgrade(db.engine, db.metadata, target=target, dry_run=dry_run)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return False
+
+    if dry_run:
+        print(f"\n✓ Dry run complete, {len(applied)} migration(s) pending")
+    elif applied:
+        print(f"\n✓ Applied {len(applied)} migration(s), schema is at version {applied[-1]}")
+    else:
+        print("✓ Database schema is up to date")
+    return True
+
+
+def show_status():
+    with app.app_context():
+        with db.engine.connect() as connection:
+            version = current_version(connection)
+            pending = pending_migrations(connection)
+    print(f"Schema version: {version} (latest: {MIGRATIONS[-1][0]})")
+    for number, migration in pending:
+        print(f"  pending: {number:04d} {migration.__name__}")
+
 
 if __name__ == '__main__':
-    migrate_database()
+    parser = argparse.ArgumentParser(description='Apply database schema migrations')
+    parser.add_argument('--dry-run', action='store_true', help='print the SQL instead of running it')
+    parser.add_argument('--status', action='store_true', help='show the current schema version')
+    parser.add_argument('--target', type=int, help='migrate up to this version')
+    args = parser.parse_args()
+
+    if args.status:
+        show_status()
+    elif not migrate_database(target=args.target, dry_run=args.dry_run):
+        raise SystemExit(1)
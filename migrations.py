@@ -0,0 +1,299 @@
+"""
+Versioned schema migrations.
+
+Applied migrations are recorded in a ``schema_version`` table and each
+pending one runs in order. Migrations are plain functions that receive a
+``MigrationContext``. Its helpers are idempotent, so databases that were
+created by ``db.create_all()`` or patched by the old migrate_db.py can be
+brought under version control without errors.
+
+Backfills update rows in primary-key ranges and commit after every chunk,
+so a large table never holds the write lock for long. In dry-run mode no
+changes are made and the SQL that would run is printed instead.
+"""
+
+import re
+import time
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import JSON, Boolean, DateTime, String, create_mock_engine, inspect, text
+
+import search_index
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+VERSION_TABLE = 'schema_version'
+
+
+class MigrationContext:
+    def __init__(self, connection, metadata, dry_run=False, out=print):
+        self.connection = connection
+        self.metadata = metadata
+        self.dry_run = dry_run
+        self.out = out
+        # Boolean literal as stored by SQLAlchemy; partial index conditions
+        # must match the rendered queries for the planner to use them.
+        self.false = '0' if connection.dialect.name == 'sqlite' else 'false'
+
+    def column_type(self, type_):
+        """Render a SQLAlchemy type for this database, e.g. DATETIME vs TIMESTAMP."""
+        return type_.compile(dialect=self.connection.dialect)
+
+    def _inspector(self):
+        return inspect(self.connection)
+
+    def has_table(self, table):
+        return self._inspector().has_table(table)
+
+    def has_column(self, table, column):
+        return any(col['name'] == column for col in self._inspector().get_columns(table))
+
+    def has_index(self, table, name):
+        return any(index['name'] == name for index in self._inspector().get_indexes(table))
+
+    def execute(self, sql, params=None):
+        if self.dry_run:
+            self.out(f'{sql};' + (f'  -- {params}' if params else ''))
+            return None
+        return self.connection.execute(text(sql), params or {})
+
+    def commit(self):
+        if not self.dry_run:
+            self.connection.commit()
+
+    def create_tables(self):
+        """Create any model tables that don't exist yet, with their indexes.
+
+        Goes through create_all() so indexes declared for one dialect only
+        (``Index.ddl_if``) are skipped on the others.
+        """
+        tables = [table for table in self.metadata.sorted_tables if not self.has_table(table.name)]
+        if not tables:
+            return
+        if self.dry_run:
+            dialect = self.connection.dialect
+            bind = create_mock_engine(
+                f'{dialect.name}://',
+                lambda ddl, *args, **kwargs: self.out(str(ddl.compile(dialect=dialect)).strip() + ';'),
+            )
+        else:
+            bind = self.connection
+        self.metadata.create_all(bind, tables=tables, checkfirst=False)
+
+    def add_column(self, table, column, definition):
+        if self.has_table(table) and not self.has_column(table, column):
+            self.execute(f'ALTER TABLE "{table}" ADD COLUMN {column} {definition}')
+
+    def create_index(self, name, table, columns, where=None, unique=False):
+        if self.has_table(table) and self.has_index(table, name):
+            return
+        sql = f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {name} ON "{table}" ({columns})'
+        if where:
+            sql += f' WHERE {where}'
+        self.execute(sql)
+
+    def backfill(self, table, assignment, condition, params=None, batch_size=1000, pause=0.0):
+        """Run ``UPDATE table SET assignment WHERE condition`` in id-range chunks.
+
+        Each chunk is committed on its own; ``pause`` seconds between chunks
+        give other writers a chance to take the lock.
+        """
+        sql = (f'UPDATE "{table}" SET {assignment} '
+               f'WHERE id > :_low AND id <= :_high AND ({condition})')
+        if self.dry_run:
+            self.out(f'{sql};  -- in chunks of {batch_size} ids' + (f', {params}' if params else ''))
+            return 0
+        max_id = self.connection.execute(text(f'SELECT MAX(id) FROM "{table}"')).scalar() or 0
+        updated = 0
+        for low in range(0, max_id, batch_size):
+            result = self.connection.execute(
+                text(sql), dict(params or {}, _low=low, _high=low + batch_size)
+            )
+            self.connection.commit()
+            updated += result.rowcount
+            if pause:
+                time.sleep(pause)
+        return updated
+
+    def backfill_values(self, table, column, values, batch_size=1000, pause=0.0):
+        """Set ``column`` from ``values`` (id -> value), ``batch_size`` rows per commit.
+
+        backfill() for values computed in Python rather than SQL.
+        """
+        sql = f'UPDATE "{table}" SET {column} = :_value WHERE id = :_id'
+        if self.dry_run:
+            self.out(f'{sql};  -- for each row, in chunks of {batch_size} rows')
+            return 0
+        ids = sorted(values)
+        for start in range(0, len(ids), batch_size):
+            self.connection.execute(
+                text(sql), [{'_value': values[id_], '_id': id_} for id_ in ids[start:start + batch_size]]
+            )
+            self.connection.commit()
+            if pause:
+                time.sleep(pause)
+        return len(ids)
+
+
+def slugify(text_):
+    """URL-safe identifier from a title: "Vibe Coding 101!" -> "vibe-coding-101"."""
+    return re.sub(r'[^a-z0-9]+', '-', text_.lower()).strip('-')[:120] or 'item'
+
+
+def _now():
+    return datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+# Migrations ------------------------------------------------------------------
+
+def m0001_initial_schema(m):
+    m.create_tables()
+
+
+def m0002_user_is_admin(m):
+    m.add_column('user', 'is_admin', f'{m.column_type(Boolean())} DEFAULT {m.false}')
+
+
+def m0003_content_updated_at(m):
+    for table in ('project', 'blog_post'):
+        m.add_column(table, 'updated_at', m.column_type(DateTime()))
+        m.commit()
+        m.backfill(table, 'updated_at = :now', 'updated_at IS NULL', {'now': _now()})
+
+
+def m0004_admin_list_indexes(m):
+    m.create_index('ix_user_created_at_id', 'user', 'created_at, id')
+    m.create_index('ix_contact_message_created_at_id', 'contact_message', 'created_at, id')
+    m.create_index('ix_feedback_created_at_id', 'feedback', 'created_at, id')
+
+
+def m0005_hot_path_indexes(m):
+    m.create_index('ix_contact_message_unread', 'contact_message', 'created_at', f'is_read = {m.false}')
+    m.create_index('ix_feedback_approved_created_at', 'feedback', 'is_approved, created_at')
+    m.create_index('ix_feedback_pending', 'feedback', 'created_at', f'is_approved = {m.false}')
+
+
+def m0006_content_slugs(m):
+    # Stable identifiers for sync_content.py to match content files against
+    for table in ('project', 'blog_post', 'video'):
+        m.add_column(table, 'slug', m.column_type(String(120)))
+        m.commit()
+        m.backfill_values(table, 'slug', {} if m.dry_run else _missing_slugs(m.connection, table))
+        m.create_index(f'ix_{table}_slug', table, 'slug', unique=True)
+
+
+def _missing_slugs(connection, table):
+    """id -> a slug from the title, for rows without one, unique within ``table``."""
+    rows = connection.execute(text(f'SELECT id, title, slug FROM "{table}" ORDER BY id')).all()
+    taken = {slug for _, _, slug in rows if slug}
+    slugs = {}
+    for id_, title, slug in rows:
+        if slug:
+            continue
+        base = slug = slugify(title)
+        counter = 2
+        while slug in taken:
+            slug = f'{base}-{counter}'
+            counter += 1
+        taken.add(slug)
+        slugs[id_] = slug
+    return slugs
+
+
+def m0007_project_details(m):
+    # Filled by sync_content.py from content/projects/
+    m.add_column('project', 'details', m.column_type(JSON()))
+
+
+def m0008_search_index(m):
+    # FTS5 is SQLite-only; other databases search with plain LIKE queries
+    if m.connection.dialect.name != 'sqlite' or m.has_table(search_index.TABLE):
+        return
+    m.execute(search_index.create_sql())
+    for table, kind, body in (('project', 'project', 'description'),
+                              ('blog_post', 'blog', 'content'),
+                              ('video', 'video', 'description')):
+        m.execute(
+            f'INSERT INTO {search_index.TABLE} (rowid, title, body) '
+            f'SELECT id * 4 + {search_index.KINDS[kind]}, title, {body} FROM "{table}"'
+        )
+    m.commit()
+
+
+def m0009_username_prefix_index(m):
+    # For usernames_with_prefix_query's "username LIKE 'base%'". SQLite's LIKE
+    # is case-insensitive and only uses a NOCASE index; PostgreSQL needs
+    # bytewise pattern ops when the database has a locale collation. User
+    # declares the same index per dialect, so new databases get it too.
+    dialect = m.connection.dialect.name
+    if dialect == 'sqlite':
+        m.create_index('ix_user_username_prefix', 'user', 'username COLLATE NOCASE')
+    elif dialect == 'postgresql':
+        m.create_index('ix_user_username_prefix', 'user', 'username text_pattern_ops')
+
+
+def m0010_user_email_lower_index(m):
+    # Signup and login match emails with lower(email) = :email
+    m.create_index('ix_user_email_lower', 'user', 'lower(email)')
+
+
+MIGRATIONS = [
+    (1, m0001_initial_schema),
+    (2, m0002_user_is_admin),
+    (3, m0003_content_updated_at),
+    (4, m0004_admin_list_indexes),
+    (5, m0005_hot_path_indexes),
+    (6, m0006_content_slugs),
+    (7, m0007_project_details),
+    (8, m0008_search_index),
+    (9, m0009_username_prefix_index),
+    (10, m0010_user_email_lower_index),
+]
+
+
+# Runner ----------------------------------------------------------------------
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ('
+        'version INTEGER NOT NULL PRIMARY KEY, '
+        'name VARCHAR(200) NOT NULL, '
+        'applied_at VARCHAR(40) NOT NULL)'
+    ))
+    connection.commit()
+
+
+def current_version(connection):
+    if not inspect(connection).has_table(VERSION_TABLE):
+        return 0
+    return connection.execute(text(f'SELECT MAX(version) FROM {VERSION_TABLE}')).scalar() or 0
+
+
+def pending_migrations(connection, target=None):
+    version = current_version(connection)
+    return [
+        (number, migration) for number, migration in MIGRATIONS
+        if number > version and (target is None or number <= target)
+    ]
+
+
+def upgrade(engine, metadata, target=None, dry_run=False, out=print):
+    """Apply pending migrations up to ``target``; return the versions applied."""
+    applied = []
+    with engine.connect() as connection:
+        if not dry_run:
+            _ensure_version_table(connection)
+        for number, migration in pending_migrations(connection, target):
+            name = migration.__name__
+            out(f'{"Would apply" if dry_run else "Applying"} {number:04d} {name}...')
+            context = MigrationContext(connection, metadata, dry_run=dry_run, out=out)
+            migration(context)
+            if not dry_run:
+                connection.execute(
+                    text(f'INSERT INTO {VERSION_TABLE} (version, name, applied_at) '
+                         'VALUES (:version, :name, :applied_at)'),
+                    {'version': number, 'name': name, 'applied_at': _now()},
+                )
+                connection.commit()
+            applied.append(number)
+    return applied
@@ -0,0 +1,223 @@
+"""
+Full-page cache for anonymous visitors.
+
+Rendered pages are stored in a small in-process LRU and, optionally, in a
+shared backend (a directory on disk) so several gunicorn workers can reuse
+each other's renders. Keys include a content version; bumping the version
+invalidates every cached page at once without having to enumerate keys.
+
+The version lives in a tiny file so that every worker, and the maintenance
+scripts that write to the database, agree on it. ``CachedValue`` uses the
+same kind of file for single values such as counters.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def read_version(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip() or '0'
+    except OSError:
+        return '0'
+
+
+def bump_version(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(str(time.time_ns()))
+    os.replace(tmp_path, path)
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileCache:
+    """Cache backend that stores one pickle per key in a shared directory.
+
+    Keys come from request URLs, so the number of files is capped: beyond
+    ``max_entries`` the least recently written ones are removed.
+    """
+
+    def __init__(self, directory, max_entries=4096):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.cache')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                stored_key, value, expires_at = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if stored_key != key or (expires_at and expires_at < time.time()):
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, value, expires_at), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        self._prune()
+
+    def _prune(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.cache')]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        def written(entry):
+            try:
+                return entry.stat().st_mtime
+            except OSError:
+                return 0
+        # Down to 90% so the next few writes don't scan and prune again
+        entries.sort(key=written)
+        for entry in entries[:len(entries) - self.max_entries * 9 // 10]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.cache'):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+class PageCache:
+    """Two-level page cache keyed by ``(content version, path)``."""
+
+    def __init__(self, version_path, ttl=300, max_entries=256, shared=None):
+        self.version_path = version_path
+        self.ttl = ttl
+        self.local = LRUCache(max_entries)
+        self.shared = shared
+
+    def version(self):
+        return read_version(self.version_path)
+
+    def _key(self, path, version):
+        return f'{version or self.version()}:{path}'
+
+    def get(self, path, version=None):
+        key = self._key(path, version)
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, self.ttl)
+        return value
+
+    def set(self, path, value, version=None):
+        """Store ``value`` under ``version``, which should be read before
+        rendering started: a page rendered while an admin write landed
+        is then stored under the old version and never served."""
+        key = self._key(path, version)
+        self.local.set(key, value, self.ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+
+    def invalidate(self):
+        """Bump the content version so every worker drops its cached pages."""
+        bump_version(self.version_path)
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+class CachedValue:
+    """A single lazily computed value with a TTL and explicit invalidation.
+
+    With ``version_path``, invalidate() bumps a version file that every
+    process checks on get(), so a write in one worker (or in a background
+    thread) is seen by all of them instead of waiting out the TTL.
+    """
+
+    def __init__(self, loader, ttl=30, version_path=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.version_path = version_path
+        self._value = None
+        self._version = None
+        self._expires_at = 0.0
+        # Bumped by invalidate(), so a load that started before a write
+        # isn't stored as fresh after it
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        # Read before loading: a value loaded while another process
+        # invalidates is stored under the old version and reloaded next time
+        version = read_version(self.version_path) if self.version_path else None
+        with self._lock:
+            if version == self._version and time.monotonic() < self._expires_at:
+                return self._value
+            generation = self._generation
+        value = self.loader()
+        with self._lock:
+            if generation == self._generation:
+                self._value = value
+                self._version = version
+                self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        if self.version_path:
+            bump_version(self.version_path)
+        with self._lock:
+            self._generation += 1
+            self._expires_at = 0.0
@@ -0,0 +1,189 @@
+"""
+Password hashing off the request path.
+
+Hashing and verifying run in a small process pool, so a burst of logins
+costs the pool's processes rather than pinning every gunicorn worker's CPU.
+The pool processes run at a lower scheduling priority than the workers
+serving pages. They are started by a fork server (spawned where that is not
+available), not forked from the worker: gunicorn workers already run other
+threads (the write-queue writer, the GitHub refresh), and a child forked
+from a multi-threaded process can deadlock on a lock one of them held.
+
+At most ``max_pending`` hashes run at once. With ``slots_path`` the bound
+is shared by every process on the host (see ``HostSlots``); without it, it
+only covers the current process. A hash that finds no free slot raises ``HasherBusy`` right away
+instead of queueing, as does one whose pool process died or took longer
+than ``timeout``; the pool is then replaced.
+
+The hash method is any Werkzeug method string, e.g. ``scrypt:32768:8:1`` or
+``pbkdf2:sha256:600000``. Hashes made with a different method or cost are
+reported by ``needs_rehash()`` so they can be upgraded on the next login.
+"""
+
+import fcntl
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# method$salt$hash as generate_password_hash writes it, scrypt or pbkdf2
+_WERKZEUG_HASH = re.compile(r'(?:scrypt:\d+:\d+:\d+|scrypt|pbkdf2:[\w-]+(?::\d+)?)\$[A-Za-z0-9]+\$[0-9a-f]+')
+
+
+class HasherBusy(Exception):
+    """Raised when too many password hashes are already waiting."""
+
+
+def hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+def is_password_hash(value):
+    """True if ``value`` is a hash verify_password() can check."""
+    return bool(_WERKZEUG_HASH.fullmatch(value))
+
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _lower_priority(nice):
+    if nice:
+        os.nice(nice)
+
+
+class HostSlots:
+    """``count`` slots shared by every process that uses the file at ``path``.
+
+    Each slot is a POSIX lock on one byte of the file. Unlike flock, these
+    locks are not inherited by child processes, and
+    the kernel drops them when the holder dies. They are per process, so
+    threads of one process are kept apart by ``_held``; use one instance per
+    file in a process.
+    """
+
+    def __init__(self, path, count):
+        self.path = path
+        self.count = count
+        self._lock = threading.Lock()
+        self._held = set()
+        self._file = None
+        self._pid = None
+
+    def acquire(self):
+        """A function that releases the slot taken, or None if all are taken."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Closing any descriptor of the file drops all of this
+                # process's locks on it, so one stays open for good
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, 'a')
+                self._pid = os.getpid()
+                self._held = set()
+            # Start at a different slot per process so they don't all contend
+            # for slot 0
+            first = os.getpid() % self.count
+            for i in range(self.count):
+                slot = (first + i) % self.count
+                if slot in self._held:
+                    continue
+                try:
+                    fcntl.lockf(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, slot)
+                except OSError:
+                    continue
+                self._held.add(slot)
+                return lambda: self._release(slot)
+        return None
+
+    def _release(self, slot):
+        with self._lock:
+            if self._pid == os.getpid():
+                fcntl.lockf(self._file, fcntl.LOCK_UN, 1, slot)
+                self._held.discard(slot)
+
+
+class _ProcessSlots:
+    def __init__(self, count):
+        self._semaphore = threading.BoundedSemaphore(count)
+
+    def acquire(self):
+        return self._semaphore.release if self._semaphore.acquire(blocking=False) else None
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt', workers=2, max_pending=8, timeout=10, nice=10, slots_path=None):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.nice = nice
+        self._slots = HostSlots(slots_path, max_pending) if slots_path else _ProcessSlots(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._prefix = None
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(verify_password, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` was made with another method or cost."""
+        if self._prefix is None:
+            # Werkzeug fills in default parameters ("scrypt" becomes
+            # "scrypt:32768:8:1"), so take the prefix from a real hash.
+            self._prefix = generate_password_hash('', method=self.method).split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._prefix
+
+    def _run(self, fn, *args):
+        release = self._slots.acquire()
+        if release is None:
+            raise HasherBusy()
+        try:
+            if not self.workers:
+                return fn(*args)
+            pool = self._get_pool()
+            try:
+                return pool.submit(fn, *args).result(timeout=self.timeout)
+            except (BrokenProcessPool, TimeoutError):
+                # A pool process was killed (OOM, segfault) or is stuck: the
+                # pool can't be used again, so the next hash gets a new one
+                self._discard_pool(pool)
+                raise HasherBusy()
+        finally:
+            release()
+
+    def _get_pool(self):
+        # One pool per process: a pool inherited across a fork is unusable
+        if self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=_pool_context(),
+                        initializer=_lower_priority,
+                        initargs=(self.nice,),
+                    )
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _discard_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = self._pool_pid = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(cancel_futures=True)
+        self._pool = self._pool_pid = None
@@ -0,0 +1,154 @@
+"""
+Token-bucket rate limiting for the public POST endpoints.
+
+A limit such as ``5/minute`` is a bucket holding up to 5 tokens that
+refills at 5 tokens per minute; each request takes one token and is
+refused while the bucket is empty. Buckets are keyed by route plus client
+IP or account.
+
+``MemoryBackend`` keeps the buckets in the worker process. ``SQLiteBackend``
+keeps them in a small SQLite file of their own, so all gunicorn workers on
+a host share one set of buckets. Both update a bucket atomically.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 60 * 60,
+    'day': 24 * 60 * 60,
+}
+
+
+class Limit:
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+    def __repr__(self):
+        return f'<Limit {self.capacity}/{self.period}s>'
+
+
+def parse_limit(text):
+    """Parse ``"<count>/<second|minute|hour|day>"``; empty, ``off`` or a
+    count of 0 means no limit."""
+    text = (text or '').strip().lower()
+    if text in ('', '0', 'off', 'none'):
+        return None
+    try:
+        count, period = text.split('/', 1)
+        count, period = int(count), PERIODS[period.strip().rstrip('s')]
+    except (ValueError, KeyError):
+        raise ValueError(f'Invalid rate limit: {text!r}')
+    if count < 0:
+        raise ValueError(f'Invalid rate limit: {text!r}')
+    # A bucket that never refills would refuse every request (and divide by zero)
+    return Limit(count, period) if count else None
+
+
+def take(tokens, updated, now, limit):
+    """Refill a bucket and try to take one token.
+
+    Returns (tokens left, allowed, seconds until a token is available).
+    """
+    if tokens is None:
+        tokens = limit.capacity
+    else:
+        tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, True, 0
+    return tokens, False, (1 - tokens) / limit.rate
+
+
+class MemoryBackend:
+    """Buckets for the current process, least recently used ones evicted first."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (None, now))
+            tokens, allowed, retry_after = take(tokens, updated, now, limit)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by every worker on the host."""
+
+    # Buckets untouched for this long are full again and can be dropped
+    PRUNE_AFTER = PERIODS['day']
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = OFF')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def hit(self, key, limit, now):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (None, now)
+            tokens, allowed, retry_after = take(tokens, updated, now, limit)
+            conn.execute(
+                'INSERT INTO bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now),
+            )
+            # Roughly one request in a thousand sweeps out idle buckets
+            if int(now * 1000) % 1000 == 0:
+                conn.execute('DELETE FROM bucket WHERE updated < ?', (now - self.PRUNE_AFTER,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM bucket')
+
+
+class RateLimiter:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def hit(self, key, limit):
+        """Take a token for ``key``; returns (allowed, Retry-After seconds)."""
+        allowed, retry_after = self.backend.hit(key, limit, time.time())
+        return allowed, (max(1, math.ceil(retry_after)) if not allowed else 0)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Rebuild the full-text search index from the projects, blog posts and
+videos tables. The index is kept up to date on every write, so this is
+only needed after changing the tables outside the app (raw SQL, restoring
+a backup) or if the index gets out of step.
+
+Usage: python rebuild_search_index.py
+"""
+
+import time
+
+import search_index
+from app import app, rebuild_search_index
+
+if __name__ == '__main__':
+    with app.app_context():
+        started = time.perf_counter()
+        try:
+            count = rebuild_search_index()
+        except search_index.IndexMissing as exc:
+            raise SystemExit(f"❌ {exc}")
+    print(f"✓ Indexed {count} documents in {(time.perf_counter() - started) * 1000:.0f}ms")
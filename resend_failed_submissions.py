@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Write contact/feedback submissions that the database rejected again.
+
+The background writer keeps retrying submissions while the database is
+locked or unreachable; only the ones that fail with an integrity or data
+error are moved to <WRITE_QUEUE_DIR>/failed/. Fix the cause (or the JSON
+file) and run this to commit them. Files that fail again are kept.
+
+Usage: python resend_failed_submissions.py
+"""
+
+from app import submission_queue
+
+if __name__ == '__main__':
+    sent, errors = submission_queue.resend_failed()
+    for name, error in errors:
+        print(f"❌ {name}: {error}")
+    print(f"✓ Re-sent {sent} submission(s), {len(errors)} still failing in {submission_queue.failed_dir()}")
@@ -0,0 +1,129 @@
+"""
+Full-text search over projects, blog posts and videos (SQLite FTS5).
+
+All three kinds share one FTS5 table with a title and a body column. A
+document's rowid encodes its kind and id (``id * 4 + kind``), so it can be
+replaced or removed with a rowid lookup when the source row changes,
+without scanning the index. Results are ranked with BM25, title matches
+weighing more than body matches, and every search term also matches as a
+prefix ("dijk" finds "Dijkstra"), helped by FTS5 prefix indexes.
+"""
+
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import text
+
+TABLE = 'search_index'
+KINDS = {'project': 1, 'blog': 2, 'video': 3}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# Snippet highlight markers, swapped for <mark> once the text is escaped
+_OPEN, _CLOSE = '\x02', '\x03'
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+class IndexMissing(Exception):
+    """Raised when the search index table hasn't been created by migration 0008."""
+
+
+def is_supported(connection):
+    return connection.dialect.name == 'sqlite'
+
+
+def exists(connection):
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (TABLE,)
+    ).first() is not None
+
+
+def create_sql():
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+        "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+
+
+def rowid(kind, item_id):
+    return item_id * 4 + KINDS[kind]
+
+
+def upsert(connection, kind, item_id, title, body):
+    key = rowid(kind, item_id)
+    connection.execute(text(f'DELETE FROM {TABLE} WHERE rowid = :rowid'), {'rowid': key})
+    connection.execute(
+        text(f'INSERT INTO {TABLE} (rowid, title, body) VALUES (:rowid, :title, :body)'),
+        {'rowid': key, 'title': title or '', 'body': body or ''},
+    )
+
+
+def delete(connection, kind, item_id):
+    connection.execute(text(f'DELETE FROM {TABLE} WHERE rowid = :rowid'), {'rowid': rowid(kind, item_id)})
+
+
+def rebuild(connection, documents):
+    """Replace the whole index with ``documents``: (kind, id, title, body) tuples.
+
+    The table itself is created by the migrations; raises IndexMissing if
+    the database hasn't been migrated.
+    """
+    if not exists(connection):
+        raise IndexMissing(f"No {TABLE} table; run python migrate_db.py first")
+    connection.execute(text(f'DELETE FROM {TABLE}'))
+    count = 0
+    batch = []
+    for kind, item_id, title, body in documents:
+        batch.append({'rowid': rowid(kind, item_id), 'title': title or '', 'body': body or ''})
+        if len(batch) >= 1000:
+            count += _insert_many(connection, batch)
+            batch = []
+    count += _insert_many(connection, batch)
+    connection.execute(text(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')"))
+    return count
+
+
+def _insert_many(connection, batch):
+    if batch:
+        connection.execute(text(f'INSERT INTO {TABLE} (rowid, title, body) VALUES (:rowid, :title, :body)'), batch)
+    return len(batch)
+
+
+def match_query(query):
+    """FTS5 MATCH expression for free text: every word, each as a prefix."""
+    terms = _TERM.findall(query.lower())[:10]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _highlight(snippet):
+    return Markup(str(escape(snippet)).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>'))
+
+
+def search(connection, query, kinds=None, limit=20):
+    """Ranked matches as dicts: kind, id, title, snippet (safe HTML) and score."""
+    expression = match_query(query)
+    if not expression:
+        return []
+    sql = (
+        f"SELECT rowid, title, "
+        f"snippet({TABLE}, 1, :open, :close, '…', 16) AS snippet, "
+        f"bm25({TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score "
+        f"FROM {TABLE} WHERE {TABLE} MATCH :query"
+    )
+    params = {'query': expression, 'open': _OPEN, 'close': _CLOSE, 'limit': limit}
+    if kinds:
+        # rowid % 4 is the kind code
+        codes = ', '.join(str(KINDS[kind]) for kind in kinds)
+        sql += f' AND rowid % 4 IN ({codes})'
+    sql += ' ORDER BY score LIMIT :limit'
+    results = []
+    for key, title, snippet, score in connection.execute(text(sql), params):
+        results.append({
+            'kind': KIND_NAMES[key % 4],
+            'id': key // 4,
+            'title': title,
+            'snippet': _highlight(snippet),
+            'score': round(-score, 4),
+        })
+    return results
@@ -16,8 +16,7 @@ Passwords are hashed using app.User.set_password.
 
 import json
 import os
-import re
-from app import app, db, User
+from app import app, db, User, allocate_username, username_base
 
 
 def parse_bool(value, default=False):
@@ -29,13 +28,8 @@ def parse_bool(value, default=False):
 
 
 def generate_username(email):
-    base = re.sub(r"[^a-zA-Z0-9]", "", email.split("@")[0]).lower()
-    username = base
-    counter = 1
-    while User.query.filter_by(username=username).first():
-        username = f"{base}{counter}"
-        counter += 1
-    return username
+    # Sees users added earlier in this run too: the query autoflushes them
+    return allocate_username(username_base(email))
 
 
 def load_users_from_env():
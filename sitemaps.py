@@ -0,0 +1,104 @@
+"""
+sitemap.xml generation.
+
+Pages are described as ``(path, lastmod, changefreq, priority)`` tuples. Up to
+``MAX_URLS`` entries produce a single <urlset>; beyond that the entries are
+split into numbered parts and /sitemap.xml becomes a <sitemapindex>.
+
+Entries are read one part at a time and each part is gzipped as it is
+rendered, so building never holds more than ``MAX_URLS`` entries, or an
+uncompressed copy next to the one being compressed.
+"""
+
+import zlib
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from http_cache import content_etag
+
+MAX_URLS = 50000
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _lastmod(value):
+    if value is None:
+        return None
+    return value.date().isoformat() if hasattr(value, 'date') else str(value)
+
+
+def iter_urlset(base_url, entries):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{SITEMAP_NS}">\n'
+    for path, lastmod, changefreq, priority in entries:
+        yield '  <url>\n'
+        yield f'    <loc>{escape(base_url + path)}</loc>\n'
+        if lastmod is not None:
+            yield f'    <lastmod>{_lastmod(lastmod)}</lastmod>\n'
+        if changefreq:
+            yield f'    <changefreq>{changefreq}</changefreq>\n'
+        if priority is not None:
+            yield f'    <priority>{priority:.1f}</priority>\n'
+        yield '  </url>\n'
+    yield '</urlset>\n'
+
+
+def iter_index(base_url, parts):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for number, lastmod in parts:
+        yield '  <sitemap>\n'
+        yield f'    <loc>{escape(base_url)}/sitemap-{number}.xml</loc>\n'
+        if lastmod is not None:
+            yield f'    <lastmod>{_lastmod(lastmod)}</lastmod>\n'
+        yield '  </sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+class SitemapDocument:
+    """A rendered sitemap document and its gzip copy.
+
+    ``lastmod`` is the newest lastmod of the entries it lists, if any.
+    """
+
+    def __init__(self, chunks, lastmod=None):
+        # wbits 31: a gzip stream, with mtime 0 so the bytes are reproducible
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+        body, gzipped = [], []
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            body.append(data)
+            gzipped.append(compressor.compress(data))
+        gzipped.append(compressor.flush())
+        self.body = b''.join(body)
+        self.gzipped = b''.join(gzipped)
+        self.etag = content_etag(self.body)
+        self.lastmod = lastmod
+
+
+def _newest(dates):
+    return max((date for date in dates if date is not None), default=None)
+
+
+def build_sitemaps(base_url, entries, max_urls=MAX_URLS):
+    """Render ``entries`` into ``{0: root document, 1..n: parts}``.
+
+    Part 0 is the urlset itself when everything fits, otherwise a sitemap
+    index pointing at parts 1..n. ``entries`` may be any iterable; it is
+    consumed ``max_urls`` entries at a time.
+    """
+    base_url = base_url.rstrip('/')
+    entries = iter(entries)
+    documents = {}
+    while True:
+        chunk = list(islice(entries, max_urls))
+        if not chunk and documents:
+            break
+        lastmod = _newest(lastmod for _, lastmod, _, _ in chunk)
+        documents[len(documents) + 1] = SitemapDocument(iter_urlset(base_url, chunk), lastmod)
+        if len(chunk) < max_urls:
+            break
+    if len(documents) == 1:
+        return {0: documents[1]}
+    index_parts = [(number, document.lastmod) for number, document in documents.items()]
+    documents[0] = SitemapDocument(iter_index(base_url, index_parts), _newest(d for _, d in index_parts))
+    return documents
@@ -0,0 +1,72 @@
+"""
+Per-connection SQLite PRAGMAs for running under several gunicorn workers.
+
+WAL journaling lets readers keep going while one writer commits, and
+busy_timeout makes a second writer wait for the lock instead of failing
+straight away with "database is locked". The values can be overridden with
+SQLITE_* environment variables; an empty value leaves that PRAGMA at the
+SQLite default.
+"""
+
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# PRAGMA name -> (environment variable, default)
+# busy_timeout comes first so that switching journal_mode waits for the lock.
+PRAGMA_SETTINGS = {
+    'busy_timeout': ('SQLITE_BUSY_TIMEOUT', '5000'),
+    'journal_mode': ('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': ('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': ('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)),
+    'cache_size': ('SQLITE_CACHE_SIZE', '-20000'),
+    'temp_store': ('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
+_SAFE_VALUE = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
+
+
+def pragmas_from_env(environ=None):
+    environ = os.environ if environ is None else environ
+    pragmas = {}
+    for name, (variable, default) in PRAGMA_SETTINGS.items():
+        value = environ.get(variable, default).strip()
+        if not value:
+            continue
+        if not set(value) <= _SAFE_VALUE:
+            raise ValueError(f'Invalid value for {variable}: {value!r}')
+        pragmas[name] = value
+    return pragmas
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def read_pragmas(dbapi_connection):
+    """Return the PRAGMA values in effect on ``dbapi_connection``."""
+    cursor = dbapi_connection.cursor()
+    try:
+        values = {}
+        for name in PRAGMA_SETTINGS:
+            row = cursor.execute(f'PRAGMA {name}').fetchone()
+            values[name] = row[0] if row else None
+        return values
+    finally:
+        cursor.close()
+
+
+def install(pragmas):
+    """Apply ``pragmas`` to every new SQLite connection made by SQLAlchemy."""
+    @event.listens_for(Engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            apply_pragmas(dbapi_connection, pragmas)
+    return _set_sqlite_pragmas
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Content Sync Script
+Makes the projects, blog posts and videos in the database match the files
+under content/ (or another directory):
+
+  content/projects/<slug>.md|yaml|yml|json   (a "details" mapping fills the project page)
+  content/blog/<slug>.md|yaml|yml|json
+  content/videos/<slug>.md|yaml|yml|json
+
+Markdown files hold YAML front matter between "---" lines; the text below
+it becomes the post content or the project/video description. Rows are
+matched by slug (the file name, unless the file sets one), so only the
+rows that actually differ are inserted, updated or deleted, ids stay the
+same, and everything is applied in a single transaction. Rows without a
+slug were not created from content files and are left alone.
+
+Usage:
+  python sync_content.py                # apply changes from content/
+  python sync_content.py --dry-run      # show what would change
+  python sync_content.py --no-delete    # never delete rows missing from the files
+  python sync_content.py --json         # print the change set as JSON
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import yaml
+
+from app import app, db, Project, BlogPost, Video
+from migrations import slugify
+
+# Content directory -> (model, fields, field that holds a Markdown body)
+CONTENT_TYPES = {
+    'projects': (Project, ('title', 'description', 'image_url', 'github_link', 'live_link', 'details'), 'description'),
+    'blog': (BlogPost, ('title', 'content', 'published_date', 'image_url'), 'content'),
+    'videos': (Video, ('title', 'description', 'video_url', 'thumbnail_url'), 'description'),
+}
+EXTENSIONS = ('.md', '.yaml', '.yml', '.json')
+
+
+class ContentError(Exception):
+    pass
+
+
+def load_file(path, body_field):
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if path.endswith('.json'):
+        return json.loads(text)
+    if path.endswith('.md'):
+        if not text.startswith('---'):
+            raise ContentError(f'{path}: missing front matter')
+        _, front_matter, body = text.split('---', 2)
+        data = yaml.safe_load(front_matter) or {}
+        data[body_field] = body.strip()
+        return data
+    return yaml.safe_load(text) or {}
+
+
+def _column_value(value):
+    # YAML turns some values into dates or numbers; the columns are text,
+    # apart from JSON ones like Project.details
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    return str(value)
+
+
+def load_items(directory, fields, body_field):
+    """Read every content file in ``directory`` into {slug: {field: value}}."""
+    items = {}
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext not in EXTENSIONS:
+            continue
+        path = os.path.join(directory, name)
+        data = load_file(path, body_field)
+        if not isinstance(data, dict):
+            raise ContentError(f'{path}: expected a mapping')
+        slug = str(data.pop('slug', None) or slugify(stem))
+        unknown = set(data) - set(fields)
+        if unknown:
+            raise ContentError(f'{path}: unknown fields {", ".join(sorted(unknown))}')
+        if slug in items:
+            raise ContentError(f'{path}: duplicate slug {slug!r}')
+        items[slug] = {field: _column_value(data.get(field)) for field in fields}
+    return items
+
+
+def diff(model, fields, items, delete=True):
+    """Apply ``items`` to ``model``'s rows in the current session; return the changes."""
+    rows = {row.slug: row for row in model.query.filter(model.slug.isnot(None))}
+    changes = {'created': [], 'updated': {}, 'deleted': []}
+    for slug, values in items.items():
+        row = rows.get(slug)
+        if row is None:
+            db.session.add(model(slug=slug, **values))
+            changes['created'].append(slug)
+            continue
+        changed = [field for field in fields if getattr(row, field) != values[field]]
+        for field in changed:
+            setattr(row, field, values[field])
+        if changed:
+            changes['updated'][slug] = changed
+    if delete:
+        for slug, row in rows.items():
+            if slug not in items:
+                db.session.delete(row)
+                changes['deleted'].append(slug)
+    return changes
+
+
+def sync_content(content_dir, dry_run=False, delete=True):
+    """Sync every content type that has a directory; return the change set."""
+    change_set = {}
+    with app.app_context():
+        try:
+            for name, (model, fields, body_field) in CONTENT_TYPES.items():
+                directory = os.path.join(content_dir, name)
+                if os.path.isdir(directory):
+                    items = load_items(directory, fields, body_field)
+                    change_set[name] = diff(model, fields, items, delete=delete)
+            if dry_run:
+                db.session.rollback()
+            else:
+                # The commit bumps the page cache version if anything changed
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return change_set
+
+
+def print_changes(change_set, dry_run):
+    total = 0
+    for name, changes in change_set.items():
+        for slug in changes['created']:
+            print(f"  + {name}/{slug}")
+        for slug, fields in changes['updated'].items():
+            print(f"  ~ {name}/{slug} ({', '.join(fields)})")
+        for slug in changes['deleted']:
+            print(f"  - {name}/{slug}")
+        total += len(changes['created']) + len(changes['updated']) + len(changes['deleted'])
+    if not total:
+        print("✓ Content is up to date")
+    elif dry_run:
+        print(f"\n✓ Dry run complete, {total} change(s) pending")
+    else:
+        print(f"\n✓ Applied {total} change(s)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sync projects, blog posts and videos from content files')
+    parser.add_argument('content_dir', nargs='?', default='content')
+    parser.add_argument('--dry-run', action='store_true', help='show the changes without applying them')
+    parser.add_argument('--no-delete', action='store_true', help='keep rows that have no content file')
+    parser.add_argument('--json', action='store_true', help='print the change set as JSON')
+    args = parser.parse_args()
+
+    try:
+        change_set = sync_content(args.content_dir, dry_run=args.dry_run, delete=not args.no_delete)
+    except (ContentError, OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(change_set, indent=2))
+    else:
+        print_changes(change_set, args.dry_run)
@@ -0,0 +1,153 @@
+import critical_css
+from critical_css import UsedSelectors, extract, fold_selectors, minify, parse, script_classes, selector_matches
+
+
+def used(tags=(), classes=(), ids=()):
+    return UsedSelectors(tags, classes, ids)
+
+
+# parse()
+
+def test_parse_splits_rules_and_statements():
+    assert parse('@layer theme, base;\n.a { color: red }\n/* note */ b{x:y}') == [
+        ('@layer theme, base', None),
+        ('.a', ' color: red '),
+        ('b', 'x:y'),
+    ]
+
+
+def test_parse_keeps_nested_blocks_whole():
+    css = '.btn{color:red;&:hover{@media (hover:hover){color:blue}}}.next{x:y}'
+    assert parse(css) == [
+        ('.btn', 'color:red;&:hover{@media (hover:hover){color:blue}}'),
+        ('.next', 'x:y'),
+    ]
+
+
+def test_parse_ignores_braces_and_semicolons_in_strings_and_comments():
+    css = '.a::before{content:"} ; {"}/* { */.b{content:\'{\'}'
+    assert parse(css) == [('.a::before', 'content:"} ; {"'), ('.b', "content:'{'")]
+
+
+# selector_matches()
+
+def test_selector_needs_every_class_tag_and_id():
+    fold = used(tags={'div'}, classes={'card', 'title'}, ids={'hero'})
+    assert selector_matches('.card .title', fold)
+    assert selector_matches('div#hero > .card', fold)
+    assert not selector_matches('.card .missing', fold)
+    assert not selector_matches('section .card', fold)
+    assert selector_matches('.missing, .card', fold)
+
+
+def test_selector_ignores_is_where_not_and_attributes():
+    fold = used(classes={'card'})
+    assert selector_matches('.card:where(.dark, .dark *)', fold)
+    assert selector_matches(':is(.card):not(.other)', fold)
+    assert selector_matches('.card[data-open="true"]', fold)
+
+
+def test_selector_unescapes_tailwind_class_names():
+    fold = used(classes={'md:px-4', 'w-1/2', 'bg-[#101923]'})
+    assert selector_matches(r'.md\:px-4', fold)
+    assert selector_matches(r'.w-1\/2', fold)
+    assert selector_matches(r'.bg-\[\#101923\]', fold)
+
+
+def test_interaction_only_selectors_are_dropped():
+    fold = used(tags={'a'}, classes={'nav', 'hover:underline', 'dark:hover:bg-black', 'active'})
+    assert not selector_matches('.nav:hover', fold)
+    assert not selector_matches('a:focus-visible', fold)
+    assert not selector_matches(r'.hover\:underline', fold)
+    assert not selector_matches(r'.dark\:hover\:bg-black', fold)
+    # A class named "active" is state set by markup, not the :active pseudo-class
+    assert selector_matches('.nav.active', fold)
+    assert selector_matches('.nav:hover, .nav', fold)
+
+
+# extract()
+
+def test_extract_recurses_into_grouping_at_rules():
+    css = (
+        '@layer utilities{.a{x:1}.b{x:2}}'
+        '@media (min-width: 768px){.a{x:3}.b{x:4}}'
+        '@supports (display:grid){@media print{.b{x:5}}}'
+        '@container (min-width: 1px){.a{x:6}}'
+    )
+    assert extract(css, used(classes={'a'})) == (
+        '@layer utilities{.a{x:1}}@media (min-width: 768px){.a{x:3}}@container (min-width: 1px){.a{x:6}}'
+    )
+
+
+def test_extract_copies_nested_blocks_of_kept_rules():
+    css = '.btn{color:red;&:disabled{opacity:.5}}.other{color:blue}'
+    assert extract(css, used(classes={'btn'})) == '.btn{color:red;&:disabled{opacity:.5}}'
+
+
+def test_extract_keeps_layer_order_font_face_and_used_keyframes():
+    css = (
+        '@layer theme, base;'
+        '@font-face{font-family:X;src:url(x.woff2)}'
+        '@keyframes spin{to{transform:rotate(1turn)}}'
+        '@keyframes unused{to{opacity:0}}'
+        '.spinner{animation:spin 1s linear infinite}'
+    )
+    assert extract(css, used(classes={'spinner'})) == (
+        '@layer theme, base;@font-face{font-family:X;src:url(x.woff2)}'
+        '.spinner{animation:spin 1s linear infinite}@keyframes spin{to{transform:rotate(1turn)}}'
+    )
+
+
+def test_extract_prunes_unread_custom_properties_and_empty_rules():
+    css = (
+        '@property --tw-shadow{syntax:"*";inherits:false;initial-value:0 0 #0000}'
+        '@property --tw-unused{syntax:"*";inherits:false}'
+        '@layer theme{:root,:host{--color-red:red;--color-blue:blue;--spacing:4px;--gap:var(--spacing)}}'
+        '@layer properties{*{--tw-unused:0}}'
+        '.a{color:var(--color-red);margin:var(--gap);box-shadow:var(--tw-shadow)}'
+    )
+    assert extract(css, used(classes={'a'})) == (
+        '@property --tw-shadow{syntax:"*";inherits:false;initial-value:0 0 #0000}'
+        '@layer theme{:root,:host{--color-red:red;--spacing:4px;--gap:var(--spacing)}}'
+        '.a{color:var(--color-red);margin:var(--gap);box-shadow:var(--tw-shadow)}'
+    )
+
+
+def test_extract_leaves_strings_alone():
+    css = '.q::before{content:"{}  ;  {";--label:"a;b"}.q{x:var(--label)}'
+    assert extract(css, used(classes={'q'})) == '.q::before{content:"{}  ;  {";--label:"a;b"}.q{x:var(--label)}'
+
+
+def test_minify_only_touches_whitespace_and_comments_outside_strings():
+    css = '.a {\n  content: "x  ;  y";\n  color : red ;\n}\n/* c */ .b{content:"/* not a comment */"}'
+    assert minify(css) == '.a{content: "x  ;  y";color : red}.b{content:"/* not a comment */"}'
+
+
+# fold_selectors()
+
+def test_fold_covers_header_and_first_content_elements():
+    html = (
+        '<body class="page"><header id="top"><nav class="nav"></nav></header>'
+        f'<div class="{critical_css.CONTENT_CLASS}"><h1 class="title"></h1><p class="lead"></p>'
+        '<section class="below"></section></div><footer class="footer"></footer></body>'
+    )
+    fold = fold_selectors(html, fold_elements=2)
+    assert {'page', 'nav', 'title', 'lead'} <= fold.classes
+    assert 'below' not in fold.classes and 'footer' not in fold.classes
+    assert 'top' in fold.ids and 'header' in fold.tags
+
+
+def test_fold_skips_inside_hidden_elements_but_keeps_their_own_classes():
+    html = (
+        '<header><nav class="mobile hidden md:hidden"><a class="mobile-link"></a></nav>'
+        '<nav class="desktop hidden md:flex"><a class="desktop-link"></a></nav>'
+        '<div hidden><span class="secret"></span></div><span class="after"></span></header>'
+    )
+    fold = fold_selectors(html)
+    assert {'mobile', 'md:hidden', 'desktop', 'desktop-link', 'after'} <= fold.classes
+    assert 'mobile-link' not in fold.classes and 'secret' not in fold.classes
+
+
+def test_script_classes_reads_class_list_calls():
+    js = "el.classList.add('open', \"is-visible\"); el.classList.toggle('dark'); el.classList.remove('gone')"
+    assert script_classes(js) == {'open', 'is-visible', 'dark'}
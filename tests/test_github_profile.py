@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import github_profile
+from github_profile import GitHubProfileCache
+
+PROFILE = {'login': 'octocat', 'name': 'The Octocat', 'public_repos': 8, 'followers': 10, 'following': 1}
+
+
+class StubGitHub(BaseHTTPRequestHandler):
+    """Answers /users/<name> with the next queued (status, body, etag) and records the request."""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        self.server.gate.wait(5)
+        status, body, etag = self.server.responses.pop(0)
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def github():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGitHub)
+    server.requests, server.responses = [], []
+    server.gate = threading.Event()
+    server.gate.set()
+    server.url = f'http://127.0.0.1:{server.server_port}'
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.gate.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock the cache reads and the test moves forward."""
+    now = [1000.0]
+    monkeypatch.setattr(github_profile, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def settle(cache, username):
+    """Wait for a background refresh of ``username`` to finish."""
+    entry = cache._entries[username.lower()]
+    deadline = time.monotonic() + 5
+    while entry.refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not entry.refreshing
+
+
+def test_cold_lookup_waits_for_the_profile(github, clock):
+    github.responses.append((200, PROFILE, '"v1"'))
+    cache = GitHubProfileCache(ttl=900, api_url=github.url)
+
+    profile = cache.get('Octocat')
+
+    assert profile['username'] == 'octocat' and profile['name'] == 'The Octocat'
+    assert github.requests == [('/users/Octocat', None)]
+    # Fresh: a second lookup doesn't go to GitHub
+    assert cache.get('octocat') is profile
+    assert len(github.requests) == 1
+
+
+def test_stale_profile_is_served_while_revalidating_with_etag(github, clock):
+    github.responses += [(200, PROFILE, '"v1"'), (304, None, None)]
+    cache = GitHubProfileCache(ttl=900, api_url=github.url)
+    profile = cache.get('octocat')
+
+    clock[0] += 901
+    github.gate.clear()
+    # Returns the stale profile at once, with the refresh still held by the server
+    assert cache.get('octocat') is profile
+    github.gate.set()
+    settle(cache, 'octocat')
+
+    assert github.requests[1] == ('/users/octocat', '"v1"')
+    assert cache.get('octocat') is profile
+    # The 304 renewed the TTL
+    clock[0] += 899
+    cache.get('octocat')
+    assert len(github.requests) == 2
+
+
+def test_changed_profile_replaces_the_cached_one(github, clock):
+    github.responses += [(200, PROFILE, '"v1"'), (200, dict(PROFILE, followers=11), '"v2"'), (304, None, None)]
+    cache = GitHubProfileCache(ttl=900, api_url=github.url)
+    cache.get('octocat')
+
+    clock[0] += 901
+    cache.get('octocat')
+    settle(cache, 'octocat')
+    assert cache.get('octocat')['followers'] == 11
+
+    clock[0] += 901
+    cache.get('octocat')
+    settle(cache, 'octocat')
+    assert github.requests[2] == ('/users/octocat', '"v2"')
+
+
+def test_server_error_keeps_the_stale_profile_for_the_error_ttl(github, clock):
+    github.responses += [(200, PROFILE, '"v1"'), (503, {'message': 'unavailable'}, None), (304, None, None)]
+    cache = GitHubProfileCache(ttl=900, error_ttl=60, api_url=github.url)
+    profile = cache.get('octocat')
+
+    clock[0] += 901
+    assert cache.get('octocat') is profile
+    settle(cache, 'octocat')
+    assert cache.get('octocat') is profile
+
+    # No retry until the error TTL is up, then revalidate with the old ETag
+    clock[0] += 59
+    cache.get('octocat')
+    assert len(github.requests) == 2
+    clock[0] += 2
+    cache.get('octocat')
+    settle(cache, 'octocat')
+    assert github.requests[2] == ('/users/octocat', '"v1"')
+    assert cache.get('octocat') is profile
+
+
+def test_failed_cold_lookup_returns_none_until_the_error_ttl(github, clock):
+    github.responses += [(500, None, None), (200, PROFILE, '"v1"')]
+    cache = GitHubProfileCache(error_ttl=60, api_url=github.url)
+
+    assert cache.get('octocat') is None
+    assert cache.get('octocat') is None
+    assert len(github.requests) == 1
+
+    clock[0] += 61
+    cache.get('octocat')
+    settle(cache, 'octocat')
+    assert cache.get('octocat')['username'] == 'octocat'
@@ -0,0 +1,92 @@
+"""
+In-process index of taken usernames.
+
+The index is a sorted list of every username, loaded with one query and
+shared by all requests in the worker, so availability checks and prefix
+lookups are a binary search instead of a database round trip. A name that
+is absent from an up-to-date index is free, so the index doubles as the
+negative cache for names nobody has.
+
+Like the page cache, the index is tied to a version file: any committed
+username change bumps it, and every worker reloads its copy on the next
+lookup. It is also reloaded after ``ttl`` seconds in case the table was
+changed behind the ORM's back. The unique index on user.username remains
+the final word when a name is actually saved.
+"""
+
+import bisect
+import re
+import threading
+import time
+
+from page_cache import bump_version, read_version
+
+
+def free_suffixes(base, taken, count=1, start=1):
+    """The first ``count`` of base, base1, base2, ... that are not in ``taken``.
+
+    ``taken`` only needs to contain the names that start with ``base``.
+    """
+    base_taken = False
+    used = set()
+    pattern = re.compile(re.escape(base) + r'([1-9]\d*)?')
+    for name in taken:
+        match = pattern.fullmatch(name)
+        if match and match.group(1):
+            used.add(int(match.group(1)))
+        elif match:
+            base_taken = True
+    found = [] if base_taken else [base]
+    suffix = start
+    while len(found) < count:
+        if suffix not in used:
+            found.append(f'{base}{suffix}')
+        suffix += 1
+    return found[:count]
+
+
+class UsernameIndex:
+    def __init__(self, loader, version_path, ttl=300):
+        self.loader = loader
+        self.version_path = version_path
+        self.ttl = ttl
+        self._names = []
+        self._version = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        version = read_version(self.version_path)
+        with self._lock:
+            if version == self._version and time.monotonic() < self._expires_at:
+                return self._names
+        names = sorted(self.loader())
+        with self._lock:
+            self._names = names
+            self._version = version
+            self._expires_at = time.monotonic() + self.ttl
+        return names
+
+    def __contains__(self, name):
+        names = self._current()
+        i = bisect.bisect_left(names, name)
+        return i < len(names) and names[i] == name
+
+    def with_prefix(self, prefix):
+        names = self._current()
+        start = bisect.bisect_left(names, prefix)
+        end = bisect.bisect_left(names, prefix + '\uffff')
+        return names[start:end]
+
+    def suggest(self, name, count=3):
+        """Free usernames built from ``name``, e.g. john2, john4, john5 for john3."""
+        base = name.rstrip('0123456789')
+        if len(base) < 3:
+            base = name
+        return free_suffixes(base, self.with_prefix(base), count)
+
+    def invalidate(self):
+        """Bump the version so every worker reloads its index."""
+        bump_version(self.version_path)
+        with self._lock:
+            self._expires_at = 0.0
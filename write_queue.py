@@ -0,0 +1,265 @@
+"""
+Write-behind queue for public form submissions.
+
+``submit()`` spools a validated submission to disk and hands it to a
+background thread, so the request can be acknowledged without waiting on
+the database write lock. The thread commits submissions in batches. A
+submission's spool file is removed only after its batch has been committed.
+
+Every process spools into its own subdirectory and holds an exclusive lock
+on it while running. On start-up a queue adopts the subdirectories of
+processes that are no longer running, so nothing is lost if a worker
+crashes between acknowledging and committing.
+
+A batch that fails stays queued and is retried with exponential backoff, so
+a database that is locked or briefly unreachable only delays the writes.
+Only submissions that fail with one of ``permanent_errors`` (the database
+rejected the row itself) are moved to ``failed/``, from where
+``resend_failed()`` can write them again once the cause is fixed.
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    """Raised by ``submit()`` when too many submissions are waiting."""
+
+
+class WriteBehindQueue:
+    def __init__(self, spool_dir, handler, max_size=1000, batch_size=100,
+                 flush_interval=0.05, fsync=True, permanent_errors=(),
+                 retry_delay=0.5, max_retry_delay=30.0):
+        self.spool_dir = spool_dir
+        self.handler = handler
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.permanent_errors = tuple(permanent_errors)
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._backoff = 0.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # Submissions accepted but not yet committed, including the batch
+        # the writer is working on
+        self._pending = 0
+        self._thread = None
+        self._pid = None
+        self._own_dir = None
+        self._lock_file = None
+        self._stopping = threading.Event()
+
+    # Public API --------------------------------------------------------------
+
+    def start(self):
+        """Start the writer and adopt abandoned spools; call once per worker."""
+        self._ensure_started()
+
+    def submit(self, kind, data):
+        """Durably accept one submission; raises QueueFull under backpressure."""
+        self._ensure_started()
+        with self._lock:
+            if self._pending >= self.max_size:
+                raise QueueFull()
+            self._pending += 1
+        try:
+            path = self._spool(kind, data)
+        except Exception:
+            self._done(1)
+            raise
+        self._queue.put((path, kind, data))
+
+    def pending(self):
+        return self._pending
+
+    def flush(self, timeout=5.0):
+        """Wait until everything submitted so far has been written."""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._pending
+
+    def close(self, timeout=5.0):
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._stopping.set()
+        self._thread.join(timeout)
+        if not self._pending:
+            shutil.rmtree(self._own_dir, ignore_errors=True)
+
+    def failed_dir(self):
+        return os.path.join(self.spool_dir, 'failed')
+
+    def resend_failed(self):
+        """Write the parked submissions again, one at a time.
+
+        Returns ``(sent, errors)`` where errors lists ``(file name, exception)``
+        for the ones that failed again; those stay in ``failed/``.
+        """
+        sent, errors = 0, []
+        if not os.path.isdir(self.failed_dir()):
+            return sent, errors
+        for name in sorted(os.listdir(self.failed_dir())):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.failed_dir(), name)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    record = json.load(f)
+                self.handler([(record['kind'], record['data'])])
+            except Exception as e:
+                errors.append((name, e))
+                continue
+            os.unlink(path)
+            sent += 1
+        return sent, errors
+
+    # Spooling ----------------------------------------------------------------
+
+    def _ensure_started(self):
+        # Started lazily, and again after a fork: gunicorn workers must not
+        # share the parent's thread or spool directory lock.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._pending = 0
+            self._stopping.clear()
+            name = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+            self._own_dir = os.path.join(self.spool_dir, name)
+            # Locked under a hidden name first: another process's _recover
+            # must never see the directory without its lock held
+            building = os.path.join(self.spool_dir, f'.{name}.tmp')
+            os.makedirs(building)
+            self._lock_file = open(os.path.join(building, '.lock'), 'w')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            os.rename(building, self._own_dir)
+            self._pid = os.getpid()
+            self._backoff = 0.0
+            self._recover()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _spool(self, kind, data):
+        name = f'{time.time_ns()}-{uuid.uuid4().hex[:8]}.json'
+        path = os.path.join(self._own_dir, name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'kind': kind, 'data': data}, f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def _recover(self):
+        """Adopt spool directories left behind by processes that have exited."""
+        for name in sorted(os.listdir(self.spool_dir)):
+            directory = os.path.join(self.spool_dir, name)
+            if (directory == self._own_dir or not os.path.isdir(directory)
+                    or name == 'failed' or name.startswith('.')):
+                continue
+            try:
+                with open(os.path.join(directory, '.lock'), 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    for item in sorted(os.listdir(directory)):
+                        if item.endswith('.json'):
+                            target = os.path.join(self._own_dir, item)
+                            os.replace(os.path.join(directory, item), target)
+                            with open(target, encoding='utf-8') as f:
+                                record = json.load(f)
+                            # Recovered items are queued even beyond max_size
+                            self._pending += 1
+                            self._queue.put((target, record['kind'], record['data']))
+            except BlockingIOError:
+                continue  # owner is still running
+            except (OSError, ValueError):
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+
+    # Writer thread -----------------------------------------------------------
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch and not self._write(batch):
+                self._backoff = min(max(self._backoff * 2, self.retry_delay), self.max_retry_delay)
+                # Left spooled on shutdown; the next worker adopts them
+                if self._stopping.wait(self._backoff):
+                    return
+            elif batch:
+                self._backoff = 0.0
+
+    def _write(self, batch):
+        """Write a batch; returns False if part of it has to be retried."""
+        retry = []
+        try:
+            self.handler([(kind, data) for _, kind, data in batch])
+        except self.permanent_errors:
+            # One bad submission must not hold up the rest: write one by one
+            # and park the ones the database rejects.
+            for item in batch:
+                try:
+                    self.handler([(item[1], item[2])])
+                except self.permanent_errors:
+                    self._park(item[0])
+                except Exception:
+                    retry.append(item)
+                else:
+                    self._remove(item[0])
+        except Exception:
+            # Temporary (locked, connection lost, ...): keep the whole batch
+            retry = batch
+        else:
+            for path, _, _ in batch:
+                self._remove(path)
+        for item in retry:
+            self._queue.put(item)
+        self._done(len(batch) - len(retry))
+        return not retry
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _done(self, count):
+        with self._lock:
+            self._pending -= count
+
+    def _park(self, path):
+        os.makedirs(self.failed_dir(), exist_ok=True)
+        try:
+            os.replace(path, os.path.join(self.failed_dir(), os.path.basename(path)))
+        except OSError:
+            pass